@@ -0,0 +1,87 @@
+# Reference binary cache server for the binary_cache option of config-cmdline.py, which stores uploaded installs
+# of dependencies in a folder. Stands in for a shared cache server (or an object store behind a proxy) on a LAN:
+#   python3 binary_cache_server.py --port 8080 --root /srv/gmat-cache
+#
+# Protocol: GET, HEAD and PUT of /artifacts/<build key>/manifest and /artifacts/<build key>/parts/<n>. PUT requests
+# carry an X-Checksum-SHA256 header with the hash of their body, which is checked before the upload is kept.
+
+import os
+import re
+import argparse
+import hashlib
+import tempfile
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+artifact_path = re.compile(r'/artifacts/([0-9a-f]{8,64})/(manifest|parts/\d+)')
+
+
+class BinaryCacheHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep connections open between requests
+    root = '.'
+
+    def artifact_file(self) -> str:
+        """
+        Get the file the requested artifact is stored in, or '' after sending an error if the path isn't valid.
+        """
+        match = artifact_path.fullmatch(self.path)
+        if not match:
+            self.send_error(404)
+            return ''
+
+        return os.path.join(self.root, match.group(1), *match.group(2).split('/'))
+
+    def send_file(self, head: bool):
+        file_path = self.artifact_file()
+        if not file_path:
+            return
+
+        if not os.path.isfile(file_path):
+            self.send_error(404)
+            return
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/octet-stream')
+        self.send_header('Content-Length', str(os.path.getsize(file_path)))
+        self.end_headers()
+        if not head:
+            with open(file_path, 'rb') as f:
+                self.wfile.write(f.read())
+
+    def do_GET(self):
+        self.send_file(head=False)
+
+    def do_HEAD(self):
+        self.send_file(head=True)
+
+    def do_PUT(self):
+        file_path = self.artifact_file()
+        if not file_path:
+            return
+
+        body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        if hashlib.sha256(body).hexdigest() != self.headers.get('X-Checksum-SHA256'):
+            self.send_error(400, 'Checksum mismatch')
+            return
+
+        # Write to a temporary file and rename it, so a reader never sees a partial upload
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        temp_fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(file_path))
+        with os.fdopen(temp_fd, 'wb') as f:
+            f.write(body)
+        os.replace(temp_path, file_path)
+
+        self.send_response(201)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Binary cache server for GMAT dependency installs')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--root', default='binary-cache', help='folder to store uploaded installs in')
+    args = parser.parse_args()
+
+    BinaryCacheHandler.root = os.path.abspath(args.root)
+    os.makedirs(BinaryCacheHandler.root, exist_ok=True)
+    print(f'Serving binary cache from {BinaryCacheHandler.root} on port {args.port}')
+    ThreadingHTTPServer(('', args.port), BinaryCacheHandler).serve_forever()
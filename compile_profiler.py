@@ -0,0 +1,57 @@
+# Compiler launcher used by config-cmdline.py when the profile_compile option is on. Runs the real compiler and
+# appends the time and peak memory it took for each source file to a JSON lines file, e.g. as the CC of a build:
+#   CC="python3 compile_profiler.py logs/xerces_compile_times.jsonl gcc"
+
+import os
+import sys
+import json
+import time
+import subprocess
+
+source_exts = ('.c', '.cc', '.cpp', '.cxx', '.m', '.mm')
+
+
+def find_source(args: list[str]) -> str:
+    """
+    Find the source file being compiled in a compiler command line, or '' if it isn't a compile (e.g. a link).
+    """
+    if '-c' not in args:
+        return ''
+
+    sources = [arg for arg in args if arg.endswith(source_exts) and not arg.startswith('-')]
+    return os.path.abspath(sources[-1]) if sources else ''
+
+
+def run_compiler(times_file: str, compiler_args: list[str]) -> int:
+    """
+    Run a compiler command, recording the time and peak memory it took if it compiled a source file.
+    Returns the exit status of the compiler.
+    """
+    start = time.perf_counter()
+    compiler = subprocess.Popen(compiler_args)
+    # wait4() includes the compiler proper (e.g. cc1plus), which the compiler driver waits for in turn
+    _, status, usage = os.wait4(compiler.pid, 0)
+    elapsed = time.perf_counter() - start
+    compiler.returncode = os.waitstatus_to_exitcode(status)
+
+    source = find_source(compiler_args)
+    if source:
+        # ru_maxrss is in kB on Linux and in bytes on macOS
+        peak_mb = usage.ru_maxrss / (1e6 if sys.platform == 'darwin' else 1e3)
+        record = json.dumps({'source': source, 'seconds': round(elapsed, 3), 'peak_mb': round(peak_mb, 1),
+                             'status': compiler.returncode}) + '\n'
+        # A single O_APPEND write keeps the lines of parallel compiles from interleaving
+        times_fd = os.open(times_file, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(times_fd, record.encode())
+        finally:
+            os.close(times_fd)
+
+    return compiler.returncode
+
+
+if __name__ == '__main__':
+    if len(sys.argv) < 3:
+        sys.exit(f'Usage: {sys.argv[0]} <times file> <compiler> [compiler arguments]')
+
+    sys.exit(run_compiler(sys.argv[1], sys.argv[2:]))
@@ -1,9 +1,29 @@
 # Version of configure.py that supports specifying build parameters as command line arguments
 import sys
 import os
+import re
+import stat
 import struct
 import shutil
 import tarfile
+import hashlib
+import subprocess
+import time
+import json
+import tempfile
+import mmap
+import gzip
+import collections
+import contextlib
+import io
+import threading
+import http.client
+import urllib.parse
+import urllib.request
+import fnmatch
+import glob
+import functools
+import concurrent.futures
 import platform as mac_plat
 
 # Example prototype command: python config-cmdline.py configs=1
@@ -39,7 +59,15 @@ gmat_path = os.path.dirname(os.path.abspath(os.getcwd()))  # Path to gmat folder
 depends_dir = str(f'{gmat_path}/depends')  # Path to depends folder
 app_debug_dir = f'{gmat_path}/application/debug'  # Path to folder for wxWidgets debug files
 logs_path = f'{depends_dir}/logs'  # Path to depends/logs folder
+runs_path = f'{logs_path}/runs'  # Path to the compressed logs of earlier runs
+run_id = f'{time.strftime("%Y%m%d-%H%M%S")}-{os.getpid()}'  # Identifies this run's logs in runs_path
+run_start = time.time() - 2  # Files in logs_path modified since then (allowing for 2 s timestamps) are this run's
+cache_path = f'{depends_dir}/cache'  # Path to depends/cache folder (results shared between builds)
+build_times_file = f'{cache_path}/build-times.json'  # How long each build step took in recent runs
 bin_path = f'{depends_dir}/bin'
+checkout_id = hashlib.sha1(depends_dir.encode()).hexdigest()[:8]  # Tells the depends folders of GMAT checkouts apart
+inventory_file = f'{depends_dir}/inventory.json'  # What is installed in depends, recorded as each install finishes
+toolchain_file = f'{cache_path}/toolchain.json'  # The tools found by the last probe_toolchain(), with their cache key
 
 # Create path variables
 depends_paths = {
@@ -72,52 +100,226 @@ versions = {
 osx_min_version = versions['osx_min']
 osx_sdk = versions['osx_sdk']
 
+# Build options, each of which can be overridden on the command line as option=value
+# e.g. python config-cmdline.py scratch_dir=/dev/shm
+options = {
+    'scratch_dir': '',  # fast location (tmpfs, local SSD, or "auto") for out-of-source build folders
+    'keep_build': False,  # keep out-of-source build folders after installing, for incremental rebuilds
+    'extract_profiles': True,  # skip archive members that GMAT never uses (see extract_profiles)
+    'wx_profile': 'full',  # "full" builds every wxWidgets library, "gmat" only those in wx_gmat_libs
+    'build_profile': 'baseline',  # optimisation flags for release libraries (see build_profiles)
+    'pgo': False,  # rebuild the CSPICE and Xerces release libraries with profile-guided optimisation
+    'cspice_unity': 0,  # compile CSPICE as this many batched (unity) translation units; 0 compiles file by file
+    'pch': False,  # build Xerces with precompiled headers, and make sure wxWidgets uses them
+    'linker': 'auto',  # "auto" links with the fastest working linker in fast_linkers, "default" the compiler's own
+    'profile_compile': False,  # record the compile time and memory of every source file, and report the slowest
+    'log_runs': 20,  # number of runs whose compressed logs are kept in logs/runs
+    'store_dir': '',  # store shared by GMAT checkouts that installs are hardlinked from ("auto" for the default)
+    'binary_cache': '',  # URL of a binary cache server to fetch installs from, e.g. http://ci-cache:8080
+    'binary_cache_push': False,  # upload new installs to the binary cache
+    'mirrors': '',  # JSON file of mirror lists per dependency, which replace those in download_mirrors
+    'mirror_ttl': 24,  # hours that a ranking of mirrors by speed is reused before they are probed again
+    'download_limit': 0,  # MB/s shared by all downloads, which go in order of download_priority(); 0 is unlimited
+    'depends_budget': 0,  # GB that depends may take up, enforced at the start of each run by the gc command; 0 is off
+    'use_system': '',  # dependencies to use from the system if compatible (not on Windows), e.g. "xerces,swig" or "all"
+    'plan_config': 'release',  # build configuration the plan command plans for: "release", "debug" or "both"
+    'plan_python': '',  # Python versions the plan command plans the API build for, e.g. "3.10,3.11"
+    'plan_json': False,  # print the plan command's plan as JSON, for schedulers
+}
 
-def setup_windows():
-    vs_arch = 'x86' if bits_32 else 'x86_amd64'  # TODO 64-bit; change to x86 for 32-bit
+# Size of each part of an install transferred to or from the binary cache, and how many parts are transferred at once
+binary_cache_part_size = 8 * 1024 * 1024
+binary_cache_jobs = 8
 
-    vc_major_version = versions['vc_major']
-    vs_version = versions['vs']
+# Dependencies that pgo_build() can build with profile-guided optimisation, which have training workloads in pgo/
+pgo_dependencies = ['xerces', 'cspice']
 
-    vs_tools = f'vs{vc_major_version}0comntools'
-    if vs_version >= 2017:
-        vs_path_base: str = f'{os.getenv("ProgramFiles")}/Microsoft Visual Studio/{vs_version}'
+# Options that change what a dependency build installs, so are part of its build key (see build_key())
+build_key_options = ['build_profile', 'wx_profile', 'pgo', 'cspice_unity']
 
-        # Check which edition of Visual Studio is installed
-        if os.path.exists(f'{vs_path_base}/Enterprise'):
-            vs_path = f'{vs_path_base}/Enterprise/Common7/Tools'
-        elif os.path.exists(f'{vs_path_base}/Professional'):
-            vs_path = f'{vs_path_base}/Professional/Common7/Tools'
-        elif os.path.exists(f'{vs_path_base}/Community'):
-            vs_path = f'{vs_path_base}/Community/Common7/Tools'
-        elif os.path.exists(f'{vs_path_base}/WDExpress'):
-            vs_path = f'{vs_path_base}/WDExpress/Common7/Tools'
-        else:
-            sys.exit("Could not find suitable Visual Studio development environment.")
+# Optimisation (opt), target architecture (arch) and link-time optimisation (lto) flags used by every release
+# build for each build profile, with the equivalent Visual Studio flags (msvc). Debug builds are unaffected.
+build_profiles = {
+    'baseline': {'opt': '-O2', 'arch': '', 'lto': '', 'msvc': '/O2'},
+    'native': {'opt': '-O3', 'arch': '-march=native', 'lto': '', 'msvc': '/O2 /arch:AVX2'},
+    'lto': {'opt': '-O3', 'arch': '-march=native', 'lto': '-flto', 'msvc': '/O2 /arch:AVX2 /GL'},
+}
+
+# Archive members to leave out (exclude) or to extract exclusively (include) for each dependency, given as
+# shell-style patterns matched against each member's path below the archive's top-level folder. A pattern
+# matching a folder also matches everything inside it.
+extract_profiles = {
+    # wxWidgets' configure only sets up the sample/demo/test folders that exist
+    'wxWidgets': {'exclude': ['docs', 'samples', 'demos', 'tests']},
+    # JDK modules for jlink and the JDK's own sources aren't needed to build or run GMAT
+    # (macOS JDKs keep these under Contents/Home)
+    'java': {'exclude': ['jmods', 'lib/src.zip', 'demo', 'sample', 'man', 'Contents/Home/jmods',
+                         'Contents/Home/lib/src.zip', 'Contents/Home/demo', 'Contents/Home/sample',
+                         'Contents/Home/man']},
+}
 
-        syscall: str = f'{vs_path}/../../VC/Auxiliary/Build/vcvarsall.bat'
+# Mirrors that each download can be fetched from, as URL templates filled in with the download's version and file
+# name. The fastest reachable mirror is tried first (see rank_mirrors()).
+download_mirrors = {
+    'xerces': [
+        'https://archive.apache.org/dist/xerces/c/3/sources/{file}',
+        'https://dlcdn.apache.org/xerces/c/3/sources/{file}',
+        'https://mirrors.ocf.berkeley.edu/apache/xerces/c/3/sources/{file}',
+    ],
+    'wxWidgets': [
+        'https://github.com/wxWidgets/wxWidgets/releases/download/v{version}/{file}',
+        'https://downloads.sourceforge.net/project/wxwindows/{version}/{file}',
+    ],
+    'cspice': [
+        'https://naif.jpl.nasa.gov/pub/naif/{path}/{file}',
+    ],
+    'swig': [
+        'https://downloads.sourceforge.net/swig/{file}',
+        'https://downloads.sourceforge.net/project/swig/swig/swig-{version}/{file}',
+    ],
+    'pcre': [
+        'https://downloads.sourceforge.net/project/pcre/pcre/{version}/{file}',
+    ],
+    'java': [
+        'https://github.com/AdoptOpenJDK/openjdk{major}-binaries/releases/download/jdk-{version}/{file}',
+    ],
+}
+mirror_ranking_file = f'{cache_path}/mirror-ranking.json'  # mirrors ranked by speed when last probed
+mirror_probe_bytes = 256 * 1024  # how much of a download is fetched from each mirror to measure its throughput
+download_chunk_size = 64 * 1024  # downloads are read, rate limited and written this much at a time
+
+# Order of downloads when their bandwidth is limited, most urgent first, for dependencies that haven't been built
+# before (see download_priority())
+default_download_order = ['wxWidgets', 'xerces', 'swig', 'pcre', 'cspice', 'java']
+
+# How to find a system-installed copy of each dependency that can be used instead of building it: the command
+# that gives its version, a pattern for the version in that command's output, and how many parts of the version
+# must match ours for it to be compatible (e.g. 2 for wxWidgets, whose ABI changes between 3.0 and 3.1). The
+# version found must also be at least ours.
+system_probes = {
+    'xerces': (['pkg-config', '--modversion', 'xerces-c'], r'^(\S+)', 1),
+    'wxWidgets': (['wx-config', '--version'], r'^(\S+)', 2),
+    'swig': (['swig', '-version'], r'SWIG Version (\S+)', 1),
+    'java': (['{java_home}/bin/java', '-version'], r'version "([^"]+)"', 1),
+}
+system_installs: dict[str, dict] = {}  # the compatible system installs found, by dependency
+
+# Python versions that the GMAT Python API can be built for
+python_minor_versions = range(6, 13)  # 3.6 to 3.12
+
+# SWIG interface files of the GMAT Python API, as patterns relative to the GMAT folder, and the GMAT libraries
+# that the API extensions link against (from application/bin)
+python_api_interfaces = ['src/**/swig/*_py.i', 'plugins/**/swig/*_py.i']
+python_api_libs = ['GmatUtil', 'GmatBase']
+
+# Build tools whose location and version are probed (see probe_toolchain()), with the arguments that make each
+# report its version. CC and CXX, when set, replace the compilers.
+posix_tools = {'cc': '--version', 'c++': '--version', 'make': '--version', 'ninja': '--version',
+               'cmake': '--version', 'pkg-config': '--version', 'ld': '--version', 'ar': '--version'}
+windows_tools = {'cl': '', 'nmake': '/?', 'cmake': '--version', 'ninja': '--version'}
+toolchain: dict = {}  # the results of probe_toolchain(), loaded or probed once per run
+
+# Approximate peak size in GB of each out-of-source build folder, to check a scratch location has room for it
+build_sizes = {
+    'xerces': 0.5,
+    'wxWidgets': 2.0,
+    'swig': 0.5,
+}
 
-    elif vs_version <= 2015:
-        vs_path = os.getenv(vs_tools)
-        syscall = f'{vs_path}/../../VC/vcvarsall.bat'
+# CSPICE sources that are always compiled on their own in a unity build, because they clash with other sources in
+# ways the source scan in write_cspice_unity_sources() doesn't detect. Sources defining types at file scope are
+# also compiled on their own automatically.
+cspice_unity_exclude: list[str] = []
+
+# Linkers that are faster than the system default, fastest first, with the executables that provide them.
+# Each is passed to the compiler as -fuse-ld=<name>.
+fast_linkers = {
+    'mold': ('mold',),
+    'lld': ('ld.lld', 'ld64.lld'),
+    'gold': ('ld.gold',),
+}
 
-    else:
-        raise ValueError(f'Visual Studio version not recognised - {vs_version}.')
+# Build log lines that show progress: "[ 45%]" from CMake's Makefiles, "[123/456]" from Ninja, and a source being
+# compiled, which make shows as a compile command (or e.g. "  CXX   file.lo" with silent rules) and cl and MSBuild
+# as the source file name. libtool echoes each compile command as "libtool: compile: ..." before running it, so
+# those echoes are left out to count each source once.
+build_progress_line = re.compile(r'^(?:\[\s*(?P<percent>\d+)%\]|\[(?P<done>\d+)/(?P<total>\d+)\]|'
+                                 r'(?P<source>(?!libtool:).*\s-c\s.*|\s*(?:CC|CXX)\s+\S+\s*|\s*\S+\.(?:c|cc|cpp|cxx)\s*)$)')
+
+# Build log lines that give the cause of a failure, as reported by GCC, Clang, MSVC, linkers and configure scripts,
+# and text that such lines contain, which can be searched for much faster than the lines themselves. A missing
+# header shows up as the compiler's "fatal error: ...: No such file or directory"; the bare message (and "command
+# not found") also turn up in healthy configure and make output, e.g. from probes of optional tools.
+build_error_line = re.compile(rb'\b[Ee]rror:|undefined reference to|Undefined symbols|cannot find -l|'
+                              rb'\berror (?:C|LNK|D)\d{4}')
+build_error_markers = [b'rror:', b'undefined reference to', b'Undefined symbols', b'cannot find -l', b'error C',
+                       b'error LNK', b'error D']
+# Errors reported by make itself, which only say which target failed
+make_error_line = re.compile(rb'make(?:\[\d+\])?: \*\*\*|NMAKE : fatal error')
+make_error_markers = [b'***', b'NMAKE : fatal error']
+# Configure checks that failed, e.g. "checking for gcc... no"
+failed_check_line = re.compile(rb'^checking .*\.\.\. (?:no|not found)$', re.M)
+
+# Headers included by most Xerces sources, which are precompiled when the pch option is on
+xerces_pch_headers = [
+    'xercesc/util/XercesDefs.hpp',
+    'xercesc/util/PlatformUtils.hpp',
+    'xercesc/util/XMemory.hpp',
+    'xercesc/util/XMLString.hpp',
+    'xercesc/util/XMLUniDefs.hpp',
+    'xercesc/util/XMLUni.hpp',
+    'xercesc/util/XMLException.hpp',
+    'xercesc/util/Janitor.hpp',
+    'xercesc/util/RefVectorOf.hpp',
+    'xercesc/util/ValueVectorOf.hpp',
+    'xercesc/util/RefHashTableOf.hpp',
+]
+
+# wxWidgets libraries that GMAT links against, which are checked for after every wxWidgets build
+wx_gmat_libs = ['base', 'net', 'xml', 'core', 'adv', 'html', 'aui', 'gl', 'stc']
+
+# Optional wxWidgets libraries, with the configure switch (Mac/Linux) and nmake setting (Windows) that disable them.
+# The "gmat" wx_profile disables each one that isn't in wx_gmat_libs.
+wx_optional_libs = {
+    'aui': ('--disable-aui', 'USE_AUI=0'),
+    'gl': ('--without-opengl', 'USE_OPENGL=0'),
+    'html': ('--disable-html', 'USE_HTML=0'),
+    'media': ('--disable-mediactrl', 'USE_MEDIA=0'),
+    'propgrid': ('--disable-propgrid', 'USE_PROPGRID=0'),
+    'qa': ('--disable-debugreport', 'USE_QA=0'),
+    'ribbon': ('--disable-ribbon', 'USE_RIBBON=0'),
+    'richtext': ('--disable-richtext', 'USE_RICHTEXT=0'),
+    'stc': ('--disable-stc', 'USE_STC=0'),
+    'webview': ('--disable-webview', 'USE_WEBVIEW=0'),
+    'xrc': ('--disable-xrc', 'USE_XRC=0'),
+}
+
+
+def parse_options(args: list[str]):
+    """
+    Apply option=value command line arguments to the options dict, converting each value to its default's type.
+    """
+    for arg in args:
+        name, sep, value = arg.partition('=')
+        if not sep or name not in options:
+            raise ValueError(f'Unrecognised argument "{arg}". Allowed options: {", ".join(options)}')
+
+        default = options[name]
+        if isinstance(default, bool):
+            options[name] = value.lower() in ('1', 'true', 'yes', 'on')
+        else:
+            options[name] = type(default)(value)
 
-    vs_env_command = f'"{syscall}" {vs_arch} & set > vsEnvironment.txt'
-    print(f'Running {vs_env_command}')
-    os.system(vs_env_command)
 
-    # Now parse the VC environment
-    with open('vsEnvironment.txt', 'r') as f:
-        env = f.read().splitlines()
-        for line in env:
-            pair = line.split('=', 1)
-            # print ("--> Setting " + pair[0] + " to " + pair[1])
-            os.environ[pair[0]] = pair[1]
+def setup_windows():
+    # The Visual Studio environment is found by the toolchain probe, and cached between runs
+    env = toolchain_info()['vs_environment']
+    if not env:
+        sys.exit("Could not find suitable Visual Studio development environment.")
 
-    # and delete the temporary settings file
-    os.remove('vsEnvironment.txt')
+    for name, value in env.items():
+        # print ("--> Setting " + name + " to " + value)
+        os.environ[name] = value
 
     # Add CMake to path
     sys.path.append('C:/Program Files/CMake/bin')
@@ -125,207 +327,2575 @@ def setup_windows():
     print("\nWindows setup complete\n")
 
 
+def extract_archive(archive: str, dependency: str, dest: str = '.'):
+    """
+    Extract a tar archive in a single streaming pass, leaving out any members excluded by the dependency's
+    extraction profile, and report how much the profile saved.
+    """
+    profile = extract_profiles.get(dependency, {}) if options['extract_profiles'] else {}
+    include: list[str] = profile.get('include', [])
+    exclude: list[str] = profile.get('exclude', [])
+
+    def matches(path: str, patterns: list[str]) -> bool:
+        return any(fnmatch.fnmatch(path, pattern) or fnmatch.fnmatch(path, f'{pattern}/*') for pattern in patterns)
+
+    extracted = skipped = skipped_bytes = 0
+    skipped_names: set[str] = set()
+    with tarfile.open(archive, 'r|*') as tar:
+        for member in tar:
+            # Match against the path below the top-level folder, e.g. "docs/index.html" in "wxWidgets-3.0.4/docs/..."
+            member_path = member.name.rstrip('/').split('/', 1)[1] if '/' in member.name.rstrip('/') else ''
+            wanted = member_path == '' or (
+                (not include or matches(member_path, include)) and not matches(member_path, exclude))
+            # A hard link to a skipped member has nothing to link to, and a streamed archive can't go back for it
+            if member.islnk() and member.linkname in skipped_names:
+                wanted = False
+            if not wanted:
+                skipped += 1
+                skipped_bytes += member.size
+                skipped_names.add(member.name)
+                continue
+
+            tar.extract(member, dest)
+            extracted += 1
+
+    if skipped:
+        print(f'-- Extracted {extracted} {dependency} files, skipping {skipped} files '
+              f'({skipped_bytes / 1e6:.1f} MB) not needed by GMAT')
+
+
+def probe_mirror(url: str) -> dict:
+    """
+    Measure the latency and throughput of a mirror by fetching the start of a download from it, and estimate how
+    long the whole download would take. Unreachable mirrors get an infinite estimate.
+    """
+    request = urllib.request.Request(url, headers={'Range': f'bytes=0-{mirror_probe_bytes - 1}'})
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(request, timeout=10) as response:
+            latency = time.perf_counter() - start
+            data = response.read(mirror_probe_bytes)
+            elapsed = max(time.perf_counter() - start - latency, 1e-3)
+            # Content-Range gives the full size of a partial response, e.g. "bytes 0-262143/3212345"
+            content_range = response.headers.get('Content-Range', '')
+            size = int(content_range.rsplit('/', 1)[1]) if '/' in content_range else len(data)
+    except (OSError, ValueError, http.client.HTTPException):
+        return {'url': url, 'estimate': float('inf')}
+
+    throughput = len(data) / elapsed
+    return {'url': url, 'latency': round(latency, 3), 'throughput': round(throughput),
+            'estimate': round(latency + size / max(throughput, 1), 3)}
+
+
+# Downloads running at once rank and forget mirrors, so updating the saved rankings is serialised
+mirror_ranking_lock = threading.Lock()
+
+
+def load_mirror_rankings() -> dict:
+    """
+    Load the saved rankings of each dependency's mirrors. A missing or unreadable rankings file counts as empty.
+    """
+    try:
+        with open(mirror_ranking_file) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_mirror_ranking(dependency: str, urls: list[str] = None):
+    """
+    Save the ranking of a dependency's mirrors, or drop it if urls is None.
+    """
+    with mirror_ranking_lock:
+        rankings = load_mirror_rankings()
+        if urls is not None:
+            rankings[dependency] = {'time': time.time(), 'urls': urls}
+        elif rankings.pop(dependency, None) is None:
+            return
+
+        os.makedirs(cache_path, exist_ok=True)
+        with open(f'{mirror_ranking_file}.{os.getpid()}.tmp', 'w') as f:
+            json.dump(rankings, f, indent=1)
+        os.replace(f'{mirror_ranking_file}.{os.getpid()}.tmp', mirror_ranking_file)
+
+
+def rank_mirrors(dependency: str, urls: list[str]) -> list[str]:
+    """
+    Order the mirrors of a download fastest first, probing them all at once, or reusing the ranking from an earlier
+    run if it is recent enough (see the mirror_ttl option). Unreachable mirrors are put last rather than left out,
+    in case they were only unreachable when probed.
+    """
+    if len(urls) < 2:
+        return urls
+
+    ranking = load_mirror_rankings().get(dependency, {})
+    if sorted(ranking.get('urls', [])) == sorted(urls) and \
+            time.time() - ranking.get('time', 0) < float(options['mirror_ttl']) * 3600:
+        return ranking['urls']
+
+    print(f'-- Probing {len(urls)} {dependency} mirrors...')
+    with concurrent.futures.ThreadPoolExecutor(len(urls)) as pool:
+        probes = sorted(pool.map(probe_mirror, urls), key=lambda probe: probe['estimate'])
+    for probe in probes:
+        if probe['estimate'] == float('inf'):
+            print(f'--   {probe["url"]}: unreachable')
+        else:
+            print(f'--   {probe["url"]}: {probe["latency"] * 1000:.0f} ms, {probe["throughput"] / 1e6:.1f} MB/s')
+
+    ranked_urls = [probe['url'] for probe in probes]
+    save_mirror_ranking(dependency, ranked_urls)
+    return ranked_urls
+
+
+def forget_mirror_ranking(dependency: str):
+    """
+    Drop the saved ranking of a dependency's mirrors, so that they are probed again next time.
+    """
+    save_mirror_ranking(dependency, None)
+
+
+# Token bucket shared by all downloads when the download_limit option is set. Tokens are bytes, added at the
+# limit's rate up to a tenth of a second's worth, and the waiting count of each priority lets only the most urgent
+# waiting downloads take them.
+bandwidth = {'condition': threading.Condition(), 'tokens': 0.0, 'time': 0.0, 'waiting': collections.Counter()}
+
+# Set to cancel the downloads in progress, e.g. when the menu is aborted while they run in the background
+download_cancel = threading.Event()
+
+
+def take_bandwidth(size: int, priority: int):
+    """
+    Wait until a download of the given priority (lower is more urgent) may read another size bytes under the
+    download_limit option. Downloads only get bandwidth when no more urgent download is waiting for it.
+    """
+    rate = float(options['download_limit']) * 1e6
+    if rate <= 0:
+        return
+
+    condition = bandwidth['condition']
+    with condition:
+        bandwidth['waiting'][priority] += 1
+        try:
+            while True:
+                now = time.monotonic()
+                capacity = max(rate / 10, size)
+                bandwidth['tokens'] = min(bandwidth['tokens'] + (now - bandwidth['time']) * rate, capacity)
+                bandwidth['time'] = now
+
+                if priority > min(bandwidth['waiting']):
+                    condition.wait(0.1)  # a more urgent download is waiting, and notifies when it's done
+                elif bandwidth['tokens'] < size:
+                    condition.wait((size - bandwidth['tokens']) / rate)
+                else:
+                    bandwidth['tokens'] -= size
+                    return
+        finally:
+            bandwidth['waiting'][priority] -= 1
+            if not bandwidth['waiting'][priority]:
+                del bandwidth['waiting'][priority]
+            condition.notify_all()
+
+
+def download_priority(dependency: str) -> int:
+    """
+    Get the priority of a dependency's download when bandwidth is limited (0 is the most urgent). Dependencies that
+    took longest to build in recent runs come first, as they hold up the build the most, followed by those that
+    haven't been built in the order of default_download_order.
+    """
+    build_times = load_build_times()
+    # PCRE is built as part of SWIG
+    build_name = {'pcre': 'swig'}.get(dependency, dependency.lower())
+
+    def build_seconds(name: str) -> float:
+        # Only the configure and build steps, not e.g. the download, which is recorded alongside them
+        return sum(history[-1]['seconds'] for step, history in build_times.get(name, {}).items()
+                   if history and step.startswith(('configure', 'build')))
+
+    seconds = build_seconds(build_name)
+    if seconds:
+        return sum(1 for name in build_times if build_seconds(name) > seconds)
+
+    return len(build_times) + (default_download_order.index(dependency)
+                               if dependency in default_download_order else len(default_download_order))
+
+
+def fetch(dependency: str, destination: str, **fields: str):
+    """
+    Download a file from the fastest of the dependency's mirrors, falling back to the others in turn if a download
+    fails. The fields (e.g. file and version) fill in the mirrors' URL templates, and mirrors using other fields are
+    skipped. The download shares the bandwidth set by the download_limit option according to its priority. If
+    download_cancel is set, the download stops and the partial file is deleted.
+    """
+    mirrors = download_mirrors[dependency]
+    if options['mirrors']:
+        with open(options['mirrors']) as f:
+            mirrors = json.load(f).get(dependency, mirrors)
+
+    mirror_urls = []
+    for mirror in mirrors:
+        try:
+            mirror_urls.append(mirror.format(**fields))
+        except (KeyError, IndexError, ValueError) as error:
+            print(f'-- Skipping {dependency} mirror {mirror}, as its URL can only use the fields '
+                  f'{", ".join(fields)} ({error!r})')
+    urls = rank_mirrors(dependency, mirror_urls)
+    priority = download_priority(dependency)
+    for url in urls:
+        if download_cancel.is_set():
+            break
+        try:
+            start = time.perf_counter()
+            with urllib.request.urlopen(url, timeout=60) as response, open(destination, 'wb') as f:
+                while True:
+                    if download_cancel.is_set():
+                        break
+                    take_bandwidth(download_chunk_size, priority)
+                    chunk = response.read(download_chunk_size)
+                    if not chunk:
+                        break
+                    f.write(chunk)
+            if not download_cancel.is_set():
+                # Recorded under the same name as the dependency's build steps, e.g. "wxwidgets"
+                record_build_time(dependency.lower(), 'download', time.perf_counter() - start, report=False,
+                                  size=os.path.getsize(destination))
+                return
+        except (OSError, http.client.HTTPException) as error:
+            print(f'-- Download from {url} failed ({error}), trying the next mirror')
+            forget_mirror_ranking(dependency)
+
+    if os.path.exists(destination):
+        os.remove(destination)
+    if download_cancel.is_set():
+        raise RuntimeError(f'Download of {fields["file"]} was cancelled.')
+    raise RuntimeError(f'Couldn\'t download {fields["file"]} from any {dependency} mirror.')
+
+
 def download_depends(params: dict):
     """
-    Download GMAT dependencies.
+    Download GMAT dependencies, all at once. Each download works with absolute paths rather than changing the
+    working directory, so they can run alongside each other.
     """
 
+    def fetch_new(folder: str, dependency: str, destination: str, **fields: str):
+        # Some downloads go into a new folder whose existence shows that they have been downloaded, so the folder
+        # is removed again if the download fails or is cancelled
+        try:
+            fetch(dependency, destination, **fields)
+        except BaseException:
+            shutil.rmtree(folder, ignore_errors=True)
+            raise
+
     def download_xerces():
         xerces_path = depends_paths['xerces']
 
         # Download xerces if it doesn't already exist
+        if 'xerces' in system_installs:
+            print('-- Using the system Xerces, so not downloading it')
+            return
         if os.path.exists(xerces_path):
             print('-- Xerces already downloaded')
             return
 
-        os.chdir(depends_dir)
-
         # Download and extract xerces
         version = versions['xerces']
         print(f'\nDownloading Xerces-C {version}...')
-        xerces_dl_com = (f'curl -L http://archive.apache.org/dist/xerces/c/3/sources/xerces-c-{version}.tar.gz'
-                         f' > xerces.tar.gz')
-        os.system(xerces_dl_com)  # run the Xerces download command
-        with tarfile.open('xerces.tar.gz', 'r:gz') as tar:
-            tar.extractall()
-        os.remove('xerces.tar.gz')
+        fetch('xerces', f'{depends_dir}/xerces.tar.gz', version=version, file=f'xerces-c-{version}.tar.gz')
+        extract_archive(f'{depends_dir}/xerces.tar.gz', 'xerces', depends_dir)
+        os.remove(f'{depends_dir}/xerces.tar.gz')
 
         # Rename the extracted xerces directory to be the proper path
-        xerces_version_folder = f'xerces-c-{version}'
-        xerces_folder_simple = os.path.basename(os.path.normpath(xerces_path))
-        os.rename(xerces_version_folder, xerces_folder_simple)
+        os.rename(f'{depends_dir}/xerces-c-{version}', xerces_path)
+
+    def download_wxwidgets():
+        # Download wxWidgets if it doesn't already exist
+        wxwidgets_path = depends_paths['wxWidgets']
+        version = versions['wxWidgets']
+
+        # Download wxWidgets if it doesn't already exist
+        if 'wxWidgets' in system_installs:
+            print('-- Using the system wxWidgets, so not downloading it')
+            return
+        if os.path.exists(wxwidgets_path):
+            print('-- wxWidgets already downloaded')
+            return
+
+        if not os.path.exists(f'{wxwidgets_path}/wxWidgets-{version}'):
+            os.makedirs(wxwidgets_path, exist_ok=True)
+
+            # Download wxWidgets source
+            print(f'\nDownloading wxWidgets {version}...')
+            fetch_new(wxwidgets_path, 'wxWidgets', f'{wxwidgets_path}/wxWidgets.tar.bz2', version=version,
+                      file=f'wxWidgets-{version}.tar.bz2')
+            extract_archive(f'{wxwidgets_path}/wxWidgets.tar.bz2', 'wxWidgets', wxwidgets_path)
+            os.remove(f'{wxwidgets_path}/wxWidgets.tar.bz2')
+
+            # Make sure wxWidgets was downloaded
+            if not os.path.exists(f'{wxwidgets_path}/wxWidgets-{version}'):
+                raise RuntimeError(f'Error in wxWidgets-{version} download.')
+
+    def download_cspice(opts: dict):
+        # Download CSPICE if it doesn't already exist
+        cspice_path = opts['path']
+        version = versions['cspice']
+        direc = opts['dir']
+
+        if os.path.exists(cspice_path):
+            print('-- CSPICE already downloaded')
+            return
+
+        os.makedirs(cspice_path, exist_ok=True)
+
+        print(f'\nDownloading {cpu_bits}-bit CSPICE {version}...')
+        if windows:
+            # Download and extract Spice for Windows (32/64-bit)
+            if os.path.exists(f'{cspice_path}/{direc}'):
+                print('CSPICE already downloaded')
+                return
+            zip_name = f'{direc}.zip'
+            fetch_new(cspice_path, 'cspice', f'{cspice_path}/{zip_name}',
+                      path=f'toolkit//C/PC_Windows_VisualC_{cpu_bits}bit/packages', version=version,
+                      file='cspice.zip')
+            os.system(f'"{depends_dir}/bin/7za/7za.exe" x "{cspice_path}/{zip_name}" -o"{cspice_path}" > nul')
+            os.rename(f'{cspice_path}/cspice', f'{cspice_path}/{direc}')
+            os.remove(f'{cspice_path}/{zip_name}')
+
+        else:  # Platform is not Windows
+            # Download and extract Spice for Mac/Linux (32/64-bit)
+            cspice_type = opts['type']
+            fetch_new(cspice_path, 'cspice', f'{cspice_path}/cspice.tar.Z', version=version, file='cspice.tar.Z',
+                      path=f'misc/toolkit_{version}/C/{cspice_type}_{cpu_bits}/packages')
+            # tarfile can't read compress (.Z) archives, so decompress them first
+            subprocess.run(['gzip', '-d', f'{cspice_path}/cspice.tar.Z'], check=True)
+            extract_archive(f'{cspice_path}/cspice.tar', 'cspice', cspice_path)
+            os.rename(f'{cspice_path}/cspice', f'{cspice_path}/{direc}')
+            os.remove(f'{cspice_path}/cspice.tar')
+
+    def download_swig(opts: dict):
+        # Download SWIG if it doesn't already exist
+        swig_direc = opts['dir']
+        swig_path = depends_paths['swig']
+        version = versions['swig']
+
+        # Check platform-appropriate path
+        if 'swig' in system_installs:
+            print('-- Using the system SWIG, so not downloading it')
+            return
+        if os.path.exists(swig_direc):
+            print('-- SWIG already downloaded')
+            return
+
+        os.makedirs(swig_path, exist_ok=True)
+
+        print(f'\nDownloading SWIG {version}...')
+
+        if windows:
+            # Download and extract SWIG for Windows
+            fetch('swig', f'{swig_path}/swig.zip', version=version, file=f'swigwin-{version}.zip')
+            os.system(f'"{depends_dir}/bin/7za/7za.exe" x "{swig_path}/swig.zip" -o"{swig_path}" > nul')
+            os.rename(f'{swig_path}/swigwin-{version}', f'{swig_path}/swigwin')
+            os.remove(f'{swig_path}/swig.zip')
+            record_install('swig', f'{swig_path}/swigwin', False, True)
+        else:
+            # Download and extract SWIG for Mac/Linux
+            fetch('swig', f'{swig_path}/swig.tar.gz', version=version, file=f'swig-{version}.tar.gz')
+            extract_archive(f'{swig_path}/swig.tar.gz', 'swig', swig_path)
+            os.rename(f'{swig_path}/swig-{version}', f'{swig_path}/swig')
+            os.remove(f'{swig_path}/swig.tar.gz')
+
+            # [GMT-6892] Download PCRE into SWIG directory
+            pcre_version = versions['pcre']
+            pcre_name = opts['pcre_name']
+            print(f'\nDownloading PCRE {pcre_version} for use with SWIG...')
+            fetch('pcre', f'{swig_direc}/{pcre_name}', version=pcre_version, file=pcre_name)
+
+    def download_java(opts: dict):
+        # Download Java if it doesn't already exist
+        java_path = f'{depends_paths["java"]}/{opts["plat"]}'
+        version = versions['java']
+        update = versions['java_update']
+
+        if use_system_install('java', f'{java_path}/jdk'):
+            return
+        if os.path.exists(f'{java_path}/jdk'):
+            print('-- Java already downloaded')
+            return
+
+        os.makedirs(java_path, exist_ok=True)
+
+        java_major_version = version.split('.')[0]
+        java_full_version = f'{version}+{update}'
+        java_file = f'OpenJDK{java_major_version}U-jdk_x64_{opts["plat"]}_hotspot_{version}_{update}'
+
+        print(f'\nDownloading Java JDK {java_full_version}...')
+        if windows:
+            # Download and extract AdoptOpenJDK for Windows
+            fetch('java', f'{java_path}/jdk.zip', major=java_major_version, version=java_full_version,
+                  file=f'{java_file}.zip')
+            os.system(f'"{depends_dir}/bin/7za/7za.exe" x "{java_path}/jdk.zip" -o"{java_path}" > nul')
+            os.rename(f'{java_path}/jdk-{java_full_version}', f'{java_path}/jdk')
+            os.remove(f'{java_path}/jdk.zip')
+        else:
+            # Download and extract AdoptOpenJDK for Mac/Linux
+            fetch('java', f'{java_path}/jdk.tar.gz', major=java_major_version, version=java_full_version,
+                  file=f'{java_file}.tar.gz')
+            extract_archive(f'{java_path}/jdk.tar.gz', 'java', java_path)
+            os.rename(f'{java_path}/jdk-{java_full_version}', f'{java_path}/jdk')
+            os.remove(f'{java_path}/jdk.tar.gz')
+        record_install('java', f'{java_path}/jdk', False, True)
+
+    print('\n*** Downloading GMAT dependencies ***')
+
+    os.chdir(depends_dir)
+    with concurrent.futures.ThreadPoolExecutor(5, thread_name_prefix='download') as pool:
+        downloads = [pool.submit(download_xerces), pool.submit(download_wxwidgets),
+                     pool.submit(download_cspice, params['cspice_opts']),
+                     pool.submit(download_swig, params['swig_opts']),
+                     pool.submit(download_java, params['java_opts'])]
+    for download in downloads:
+        download.result()  # raise the first error from any download
+
+    print("\nDependencies download complete")
+
+
+class PrefetchOutput:
+    """
+    Stands in for sys.stdout while dependencies are downloaded in the background during the menu, holding back what
+    the download threads print so that it doesn't get mixed up with the menu's prompts.
+    """
+
+    def __init__(self, stdout):
+        self.stdout = stdout
+        self.held = io.StringIO()
+        self.holding = True
+        self.lock = threading.Lock()
+
+    def write(self, text: str) -> int:
+        if threading.current_thread().name.startswith(('prefetch', 'download')):
+            with self.lock:
+                if self.holding:
+                    return self.held.write(text)
+        return self.stdout.write(text)
+
+    def release(self):
+        """
+        Print the held back output, and pass anything printed from now on straight through.
+        """
+        with self.lock:
+            self.holding = False
+            self.stdout.write(self.held.getvalue())
+
+    def __getattr__(self, name: str):
+        return getattr(self.stdout, name)
+
+
+def start_prefetch(params: dict) -> concurrent.futures.Future:
+    """
+    Start downloading the dependencies in the background, which doesn't depend on the answers to the menu, so that
+    the time spent answering it isn't wasted.
+    """
+    sys.stdout = PrefetchOutput(sys.stdout)
+    download_cancel.clear()
+    prefetch_pool = concurrent.futures.ThreadPoolExecutor(1, thread_name_prefix='prefetch')
+    prefetch = prefetch_pool.submit(download_depends, params)
+    prefetch_pool.shutdown(wait=False)
+    return prefetch
+
+
+def finish_prefetch(prefetch: concurrent.futures.Future, cancel: bool = False):
+    """
+    Show what the background downloads have printed so far, and wait for them to finish, raising any error they
+    failed with. If cancel is set, the downloads are cancelled instead, so that exiting doesn't wait for them.
+    """
+    if not isinstance(sys.stdout, PrefetchOutput):
+        return
+
+    sys.stdout.release()
+    try:
+        if cancel:
+            if not prefetch.done():
+                download_cancel.set()
+                print('\n-- Cancelling dependency downloads')
+            return
+        if not prefetch.done():
+            print('\n-- Waiting for dependency downloads to finish...')
+        prefetch.result()
+    finally:
+        sys.stdout = sys.stdout.stdout
+
+
+def make_depend(dependency: str, install_type: str, make_args: str = ''):
+    dep_l = dependency.lower()  # convert name to lowercase
+    install = 'install ' if install_type.startswith('install') else ''
+    j_cores = f' -j{cores}' if 'build' in install_type else ''
+    make_args = f' {make_args}' if make_args else ''
+    log_file = f'{logs_path}/{dep_l}_{install_type}.log'
+    make_flag = run_timed(dep_l, install_type, f'make {install}{j_cores}{make_args}> "{log_file}" 2>&1', log_file)
+    if make_flag != 0:
+        raise RuntimeError(f'{dependency} {install_type} build failed. Fix errors and try again.')
+
+
+def load_build_times() -> dict:
+    """
+    Load the times taken by the build steps of each dependency in recent runs.
+    """
+    if not os.path.exists(build_times_file):
+        return {}
+
+    with open(build_times_file, 'r') as f:
+        return json.load(f)
+
+
+# Downloads running at once record their times, so saving them is serialised
+build_times_lock = threading.Lock()
+
+
+def record_build_time(dependency: str, step: str, seconds: float, sources: int = 0, report: bool = True,
+                      size: int = 0):
+    """
+    Save how long a build step took and how many sources it compiled (or bytes it downloaded), along with the
+    options that affect it, and (if report is set) report it. For dependencies that can use precompiled headers,
+    the last time taken with the pch option switched the other way is reported too, so the difference they make
+    can be seen.
+    """
+    with build_times_lock:
+        build_times = load_build_times()
+        history: list[dict] = build_times.setdefault(dependency, {}).setdefault(step, [])
+        message = f'-- {dependency} {step} took {seconds:.0f} s'
+        if dependency in ('xerces', 'wxwidgets'):
+            message += ' with PCH' if options['pch'] else ' without PCH'
+            other_runs = [run for run in history if run['pch'] != options['pch']]
+            if other_runs:
+                message += f' ({other_runs[-1]["seconds"]:.0f} s {"without" if options["pch"] else "with"} PCH)'
+        if report:
+            print(message)
+
+        history.append({'seconds': round(seconds, 1), 'sources': sources, 'pch': options['pch'],
+                        'build_profile': options['build_profile'], 'date': time.strftime('%Y-%m-%d %H:%M:%S')})
+        if size:
+            history[-1]['bytes'] = size
+        del history[:-10]  # only recent runs are relevant
+
+        os.makedirs(cache_path, exist_ok=True)
+        with open(f'{build_times_file}.tmp', 'w') as f:
+            json.dump(build_times, f, indent=1)
+        os.replace(f'{build_times_file}.tmp', build_times_file)
+
+
+def find_log_line(log: mmap.mmap, markers: list[bytes], line_pattern: re.Pattern) -> tuple[int, int]:
+    """
+    Find the first line of a log that matches a pattern, by searching for each of the markers the line must contain
+    and only then checking the lines they are found in. Returns the start and end of the line, or (-1, -1).
+    """
+    first_line = (-1, -1)
+    for marker in markers:
+        position = log.find(marker)
+        while position != -1 and (first_line[0] == -1 or position < first_line[0]):
+            line_start = log.rfind(b'\n', 0, position) + 1
+            line_end = log.find(b'\n', position)
+            line_end = len(log) if line_end == -1 else line_end
+            if line_pattern.search(log, line_start, line_end):
+                first_line = (line_start, line_end)
+                break
+            position = log.find(marker, line_end)
+
+    return first_line
+
+
+def open_log(log_file: str):
+    """
+    Open a log for reading as text, whether it is plain or gzip-compressed. Compressed logs are decompressed as
+    they are read, rather than to disk.
+    """
+    if log_file.endswith('.gz'):
+        return gzip.open(log_file, 'rt', errors='replace')
+    return open(log_file, 'r', errors='replace')
+
+
+def triage_log(log_file: str) -> str:
+    """
+    Diagnose a failed build step from its log: find the first compiler, linker or configure error, with the lines
+    around it, or failing that the first error reported by make. For a configure error, the checks that failed
+    before it are listed too. The log is searched through a memory map, so even very large logs take well under a
+    second.
+    """
+    if log_file.endswith('.gz'):
+        # A log archived by an earlier run: decompress it so it can be searched the same way
+        with tempfile.TemporaryDirectory() as temp_dir:
+            plain_log = f'{temp_dir}/{os.path.basename(log_file)[:-len(".gz")]}'
+            with gzip.open(log_file, 'rb') as gz_log, open(plain_log, 'wb') as f:
+                shutil.copyfileobj(gz_log, f, 1024 * 1024)
+            return triage_log(plain_log).replace(plain_log, log_file)
+
+    try:
+        with open(log_file, 'rb') as f:
+            log = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (FileNotFoundError, ValueError):  # ValueError: empty file
+        return f'-- {log_file} is missing or empty'
+
+    def log_lines(start: int, end: int) -> list[str]:
+        return [line.decode(errors='replace').rstrip('\r')[:200] for line in log[start:end].rstrip().split(b'\n')]
+
+    with log:
+        diagnosis = [f'-- Diagnosis from {log_file}:']
+        error_start, error_end = find_log_line(log, build_error_markers, build_error_line)
+        if error_start == -1:
+            error_start, error_end = find_log_line(log, make_error_markers, make_error_line)
+
+        if error_start == -1:
+            diagnosis.append('   No error message found. The log ends with:')
+            start = len(log)
+            for _ in range(6):
+                start = log.rfind(b'\n', 0, max(start - 1, 0))
+                if start == -1:
+                    break
+            diagnosis += [f'     {line}' for line in log_lines(start + 1, len(log)) if line]
+            return '\n'.join(diagnosis)
+
+        # Show the error with up to three lines either side
+        start = error_start
+        for _ in range(3):
+            start = log.rfind(b'\n', 0, max(start - 1, 0)) + 1
+        end = error_end
+        for _ in range(3):
+            next_end = log.find(b'\n', end + 1)
+            end = next_end if next_end != -1 else len(log)
+
+        line_number = log[:error_start].count(b'\n') + 1
+        diagnosis.append(f'   First error, on line {line_number}:')
+        error_line = log[start:error_start].count(b'\n')
+        diagnosis += [f'   {">" if i == error_line else " "} {line}' for i, line in enumerate(log_lines(start, end))]
+
+        if b'configure: error' in log[error_start:error_end]:
+            failed_checks = failed_check_line.findall(log, 0, error_start)
+            if failed_checks:
+                diagnosis.append('   Last configure checks that failed before it:')
+                diagnosis += [f'     {check.decode(errors="replace")}' for check in failed_checks[-5:]]
+
+    return '\n'.join(diagnosis)
+
+
+def compress_log(log_file: str, run_dir: str) -> dict:
+    """
+    Compress a log into a run's folder, streaming it through gzip. Returns the log's entry for the run index.
+    """
+    name = os.path.basename(log_file)
+    with open(log_file, 'rb') as plain_log, gzip.open(f'{run_dir}/{name}.gz', 'wb', compresslevel=6) as gz_log:
+        shutil.copyfileobj(plain_log, gz_log, 1024 * 1024)
+
+    return {'file': f'{run_id}/{name}.gz', 'bytes': os.path.getsize(log_file),
+            'compressed_bytes': os.path.getsize(f'{run_dir}/{name}.gz')}
+
+
+def archive_logs(failed: bool):
+    """
+    Copy this run's logs into a compressed folder of their own in runs_path, indexed by run ID and step, and remove
+    the oldest runs beyond the log_runs limit. The plain logs are then removed from logs_path, except after a failed
+    run, when they are left so the failure is easy to look into. Reports such as compile time reports always stay
+    in logs_path, where the messages about them point.
+    """
+    if not os.path.isdir(logs_path):
+        return
+
+    # Reports left by earlier runs have already been archived with them
+    log_files = [entry.path for entry in os.scandir(logs_path)
+                 if entry.is_file() and entry.stat().st_mtime >= run_start]
+    if not log_files:
+        return
+
+    run_dir = f'{runs_path}/{run_id}'
+    os.makedirs(run_dir, exist_ok=True)
+    with concurrent.futures.ThreadPoolExecutor(os.cpu_count() or 1) as pool:
+        # zlib releases the GIL while compressing, so logs compress in parallel
+        entries = dict(zip(log_files, pool.map(compress_log, log_files, [run_dir] * len(log_files))))
+
+    index_file = f'{runs_path}/index.json'
+    index: dict = {}
+    if os.path.exists(index_file):
+        with open(index_file, 'r') as f:
+            index = json.load(f)
+    # Steps are named after their logs, e.g. "xerces_build_release" for xerces_build_release.log
+    index[run_id] = {'status': 'failed' if failed else 'succeeded',
+                     'logs': {os.path.splitext(os.path.basename(log_file))[0]: entry
+                              for log_file, entry in entries.items()}}
+
+    # Run IDs are timestamps, so the oldest sort first
+    for old_run in sorted(index)[:-options['log_runs']] if options['log_runs'] > 0 else []:
+        shutil.rmtree(f'{runs_path}/{old_run}', ignore_errors=True)
+        del index[old_run]
+
+    with open(f'{index_file}.tmp', 'w') as f:
+        json.dump(index, f, indent=1)
+    os.replace(f'{index_file}.tmp', index_file)
+
+    if not failed:
+        for log_file in log_files:
+            if log_file.endswith(('.log', '.jsonl')):
+                os.remove(log_file)
+
+    saved = sum(entry['bytes'] - entry['compressed_bytes'] for entry in entries.values())
+    print(f'-- Logs of this run saved in {run_dir} ({saved / 1e6:.1f} MB saved by compression)')
+
+
+def clear_failed_logs():
+    """
+    Remove the plain logs left in logs_path by a failed run, which were archived when it ended, so they can't be
+    mistaken for (or appended to by) this run's logs.
+    """
+    index_file = f'{runs_path}/index.json'
+    if not os.path.exists(index_file):
+        return
+
+    with open(index_file, 'r') as f:
+        index = json.load(f)
+    last_run = index[max(index)] if index else {}
+    if last_run.get('status') != 'failed':
+        return
+
+    for entry in last_run['logs'].values():
+        log_file = f'{logs_path}/{os.path.basename(entry["file"])[:-len(".gz")]}'
+        if os.path.exists(log_file):
+            os.remove(log_file)
+
+
+def follow_build_log(log_file: str, progress: dict):
+    """
+    Read whatever has been added to a build log since it was last read, counting the sources compiled so far and
+    picking up the progress reported by CMake and Ninja. Only new output is read, so following even a very large
+    log costs next to nothing.
+    """
+    try:
+        with open(log_file, 'rb') as log:
+            log.seek(progress['position'])
+            new_output = log.read()
+            progress['position'] = log.tell()
+    except FileNotFoundError:
+        return  # the build hasn't started writing it yet
+
+    lines = (progress['partial'] + new_output.decode(errors='replace')).split('\n')
+    progress['partial'] = lines.pop()  # the last line may not be complete yet
+    for line in lines:
+        match = build_progress_line.match(line)
+        if match is None:
+            continue
+        if match.group('percent') is not None:
+            progress['percent'] = int(match.group('percent'))
+        elif match.group('done') is not None:
+            progress['percent'] = 100 * int(match.group('done')) // int(match.group('total'))
+            progress['sources'] = int(match.group('done'))
+        else:
+            progress['sources'] += 1
+
+
+def show_progress(dependency: str, step: str, progress: dict, elapsed: float, last_run: dict):
+    """
+    Draw a progress bar for a running build step, estimating the time left from the progress reported in its log,
+    or failing that, from the number of sources or the time of its last successful run.
+    """
+    if not sys.stdout.isatty():
+        return
+
+    if progress['percent'] is not None:
+        fraction = progress['percent'] / 100
+    elif last_run.get('sources'):
+        fraction = min(progress['sources'] / last_run['sources'], 0.99)
+    elif last_run.get('seconds'):
+        fraction = min(elapsed / last_run['seconds'], 0.99)
+    else:
+        fraction = None
+
+    def minutes(seconds: float) -> str:
+        return f'{int(seconds) // 60}:{int(seconds) % 60:02d}'
+
+    status = f'-- {dependency} {step}'
+    if fraction is None:
+        status += f'  {progress["sources"]} sources compiled  {minutes(elapsed)} elapsed'
+    else:
+        # Early on, the time the last run took says more than the rate so far
+        if fraction < 0.1 and last_run.get('seconds'):
+            remaining = max(last_run['seconds'] - elapsed, 0)
+        else:
+            remaining = elapsed / max(fraction, 0.01) - elapsed
+        filled = int(fraction * 20)
+        status += f' [{"#" * filled}{"-" * (20 - filled)}] {fraction * 100:3.0f}%  ETA {minutes(remaining)}'
+
+    print(f'\r{status:<79}', end='', flush=True)
+
+
+def run_timed(dependency: str, step: str, command: str, log_file: str = '') -> int:
+    """
+    Run a build command, recording how long it took if it succeeds. While it runs, the log it writes to is followed
+    to show its progress and the estimated time left. Returns the exit status of the command.
+    """
+    history = load_build_times().get(dependency, {}).get(step, [])
+    last_run = history[-1] if history else {}
+    progress = {'position': 0, 'partial': '', 'sources': 0, 'percent': None}
+
+    start = time.perf_counter()
+    build = subprocess.Popen(command, shell=True)
+    while True:
+        try:
+            build.wait(timeout=0.5)
+            break
+        except subprocess.TimeoutExpired:
+            pass
+
+        if log_file:
+            follow_build_log(log_file, progress)
+        show_progress(dependency, step, progress, time.perf_counter() - start, last_run)
+    elapsed = time.perf_counter() - start
+
+    if log_file:
+        follow_build_log(log_file, progress)
+    if sys.stdout.isatty():
+        print(f'\r{"":<79}\r', end='')
+
+    if build.returncode == 0:
+        record_build_time(dependency, step, elapsed, progress['sources'])
+    elif log_file:
+        print(triage_log(log_file))
+    return build.returncode
+
+
+def compile_profiler(dependency: str, compiler: str) -> str:
+    """
+    Get the command that runs a compiler through compile_profiler.py, which records the time and peak memory of
+    each source file it compiles in the dependency's compile times file.
+    """
+    profiler = f'{os.path.dirname(os.path.abspath(__file__))}/compile_profiler.py'
+    return f'"{sys.executable}" "{profiler}" "{logs_path}/{dependency}_compile_times.jsonl" {compiler}'
+
+
+def profiled_compilers(dependency: str) -> str:
+    """
+    Start recording compile times for a dependency if the profile_compile option is on, clearing those of any
+    earlier build. Returns the configure arguments that send its compiles through compile_profiler.py.
+    """
+    if not options['profile_compile']:
+        return ''
+
+    times_file = f'{logs_path}/{dependency}_compile_times.jsonl'
+    if os.path.exists(times_file):
+        os.remove(times_file)
+
+    return (f"CC='{compile_profiler(dependency, os.getenv('CC', 'cc'))}' "
+            f"CXX='{compile_profiler(dependency, os.getenv('CXX', 'c++'))}'")
+
+
+def compile_time_report(dependency: str, times_file: str = ''):
+    """
+    Summarise the compile times recorded for a dependency: a report ranking its slowest and most memory-hungry
+    sources and its slowest folders, and the times per folder and source in the folded format read by flame graph
+    tools such as flamegraph.pl and speedscope. The times of an earlier run can be given as its compressed times
+    file in runs_path, e.g. logs/runs/<run ID>/xerces_compile_times.jsonl.gz.
+    """
+    if not times_file:
+        if not options['profile_compile']:
+            return
+        times_file = f'{logs_path}/{dependency}_compile_times.jsonl'
+    if not os.path.exists(times_file):
+        return
+
+    with open_log(times_file) as f:
+        compiles = [json.loads(line) for line in f if line.strip()]
+    if not compiles:
+        return
+
+    sources = [compiled['source'] for compiled in compiles]
+    root = os.path.commonpath(sources) if len(set(sources)) > 1 else os.path.dirname(sources[0])
+    total = sum(compiled['seconds'] for compiled in compiles)
+    folder_times: dict[str, float] = {}
+    folded: dict[str, float] = {}
+    for compiled in compiles:
+        compiled['path'] = os.path.relpath(compiled['source'], root)
+        folder = os.path.dirname(compiled['path']) or '.'
+        folder_times[folder] = folder_times.get(folder, 0) + compiled['seconds']
+        stack = ';'.join([dependency] + compiled['path'].split(os.sep))
+        folded[stack] = folded.get(stack, 0) + compiled['seconds']
+
+    slowest = sorted(compiles, key=lambda compiled: compiled['seconds'], reverse=True)
+    largest = sorted(compiles, key=lambda compiled: compiled['peak_mb'], reverse=True)
+    report = [f'{len(compiles)} {dependency} compiles took {total:.1f} s of compiler time in total',
+              f'Source paths are relative to {root}', '',
+              'Slowest sources:', f'{"seconds":>9} {"peak MB":>9}  source']
+    report += [f'{compiled["seconds"]:9.2f} {compiled["peak_mb"]:9.0f}  {compiled["path"]}' for compiled in slowest[:50]]
+    report += ['', 'Most memory-hungry sources:', f'{"seconds":>9} {"peak MB":>9}  source']
+    report += [f'{compiled["seconds"]:9.2f} {compiled["peak_mb"]:9.0f}  {compiled["path"]}' for compiled in largest[:20]]
+    report += ['', 'Slowest folders:', f'{"seconds":>9} {"share":>6}  folder']
+    report += [f'{seconds:9.1f} {seconds / total * 100:5.1f}%  {folder}'
+               for folder, seconds in sorted(folder_times.items(), key=lambda item: item[1], reverse=True)]
+
+    with open(f'{logs_path}/{dependency}_compile_report.txt', 'w') as f:
+        f.write('\n'.join(report) + '\n')
+    with open(f'{logs_path}/{dependency}_compile_times.folded', 'w') as f:
+        f.write(''.join(f'{stack} {round(seconds * 1000)}\n' for stack, seconds in sorted(folded.items())))
+
+    slowest_names = ', '.join(f'{compiled["path"]} ({compiled["seconds"]:.1f} s)' for compiled in slowest[:3])
+    print(f'-- Slowest {dependency} sources: {slowest_names}. See {logs_path}/{dependency}_compile_report.txt')
+
+
+def check_pch(dependency: str, pch_files: list[str], log_file: str = ''):
+    """
+    Report whether a dependency was really built with precompiled headers, from the precompiled header files its
+    build produced and any warnings about them not being used in its build log.
+    """
+    if not options['pch']:
+        return
+
+    if not pch_files:
+        print(f'-- {dependency} was built without precompiled headers, as its build couldn\'t use them')
+        return
+
+    unused = 0
+    if log_file and os.path.exists(log_file):
+        with open(log_file, 'r', errors='replace') as f:
+            unused = sum('not used because' in line for line in f)
+    if unused:
+        print(f'-- {unused} {dependency} sources couldn\'t use the precompiled headers. See {log_file}')
+    else:
+        print(f'-- {dependency} was built using precompiled headers')
+
+
+@functools.lru_cache(maxsize=None)
+def toolchain_commands() -> dict[str, tuple[str, str]]:
+    """
+    Get the command that runs each tool to probe, and the arguments that make it report its version.
+    """
+    commands = {name: (name, args) for name, args in (windows_tools if windows else posix_tools).items()}
+    if not windows:
+        commands['cc'] = (os.getenv('CC', 'cc'), '--version')
+        commands['c++'] = (os.getenv('CXX', 'c++'), '--version')
+        for linker_exes in fast_linkers.values():
+            commands.update({linker_exe: (linker_exe, '--version') for linker_exe in linker_exes})
+    if macos:
+        commands['xcrun'] = ('xcrun', '--show-sdk-path')
+    return commands
+
+
+def python_candidates() -> dict[str, str]:
+    """
+    Find where each Python version the API can be built for would be installed, whether or not it is.
+    """
+    candidates = {}
+    for minor in python_minor_versions:
+        if windows:
+            candidates[f'3.{minor}'] = f'{os.getenv("LOCALAPPDATA")}/Programs/Python/Python3{minor}/python.exe'
+        else:
+            candidates[f'3.{minor}'] = shutil.which(f'python3.{minor}') or ''
+    return candidates
+
+
+def find_vcvarsall() -> str:
+    """
+    Find the vcvarsall.bat of the newest edition of Visual Studio installed, or '' if there isn't one.
+    """
+    vs_version = versions['vs']
+    if vs_version >= 2017:
+        vs_path_base: str = f'{os.getenv("ProgramFiles")}/Microsoft Visual Studio/{vs_version}'
+        for edition in ('Enterprise', 'Professional', 'Community', 'WDExpress'):
+            if os.path.exists(f'{vs_path_base}/{edition}'):
+                return f'{vs_path_base}/{edition}/VC/Auxiliary/Build/vcvarsall.bat'
+        return ''
+
+    elif vs_version <= 2015:
+        vs_path = os.getenv(f'vs{versions["vc_major"]}0comntools')
+        return f'{vs_path}/../../VC/vcvarsall.bat' if vs_path else ''
+
+    else:
+        raise ValueError(f'Visual Studio version not recognised - {vs_version}.')
+
+
+def toolchain_key(commands: dict[str, tuple[str, str]]) -> str:
+    """
+    Generate a hash of everything a toolchain probe depends on that can be checked cheaply: the PATH, and the
+    location and modification time of each tool, Python install (and its debug library on Windows), Visual Studio,
+    and the developer folder that xcode-select picks on macOS, which decides the SDK xcrun reports. A probe's
+    results are reused for as long as the key stays the same.
+    """
+    def stamp(path: str) -> str:
+        return f'{path} {os.path.getmtime(path)}' if path and os.path.exists(path) else f'{path} missing'
+
+    key = hashlib.sha256(f'{plat} {cpu_bits} {os.getenv("PATH", "")}'.encode())
+    for name, (command, _) in sorted(commands.items()):
+        key.update(f'{name}={command} {stamp(shutil.which(command.split()[0]) or "")}\n'.encode())
+    for version, python in sorted(python_candidates().items()):
+        key.update(f'python{version} {stamp(python)}\n'.encode())
+        if windows:
+            debug_lib = f'{os.path.dirname(python)}/libs/python{version.replace(".", "")}_d.lib'
+            key.update(f'python{version} debug {stamp(debug_lib)}\n'.encode())
+    if windows:
+        key.update(stamp(find_vcvarsall()).encode())
+    if macos:
+        try:
+            developer_dir = subprocess.run(['xcode-select', '-p'], capture_output=True, text=True,
+                                           timeout=10).stdout.strip()
+        except (OSError, subprocess.TimeoutExpired):
+            developer_dir = ''
+        key.update(f'xcode {os.getenv("DEVELOPER_DIR", "")} {stamp(developer_dir)}\n'.encode())
+    return key.hexdigest()
+
+
+def probe_tool(command: str, version_args: str) -> dict:
+    """
+    Find where a tool is installed and the version it reports, or return None if it isn't installed.
+    """
+    tool_exe = shutil.which(command.split()[0])
+    if tool_exe is None:
+        return None
+
+    try:
+        result = subprocess.run(f'{command} {version_args}', shell=True, capture_output=True, text=True, timeout=60)
+        version = result.stdout or result.stderr  # cl reports its version on stderr
+    except (OSError, subprocess.TimeoutExpired):
+        version = ''
+    return {'path': os.path.realpath(tool_exe), 'mtime': os.path.getmtime(tool_exe), 'version': version.strip()}
+
+
+def probe_python(python: str) -> dict:
+    """
+    Get the version and include folder of a Python install, and whether it has a debug library (on Windows), or
+    return None if it isn't installed.
+    """
+    if not python or not os.path.exists(python):
+        return None
+
+    try:
+        result = subprocess.run([python, '-c', 'import sys, sysconfig; print(sys.version.split()[0]); '
+                                               'print(sysconfig.get_paths()["include"]); '
+                                               'print(sysconfig.get_config_var("EXT_SUFFIX"))'],
+                                capture_output=True, text=True, timeout=60)
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    if result.returncode != 0:
+        return None
+
+    version, include, ext_suffix = result.stdout.split('\n')[:3]
+    version_nodot = ''.join(version.split('.')[:2])
+    debug_lib = f'{os.path.dirname(python)}/libs/python{version_nodot}_d.lib'
+    return {'path': python, 'version': version, 'include': include, 'ext_suffix': ext_suffix,
+            'debug_lib': debug_lib if windows and os.path.exists(debug_lib) else ''}
+
+
+def vs_environment() -> dict[str, str]:
+    """
+    Get the environment that Visual Studio's vcvarsall.bat sets up for building, or None if it isn't installed.
+    """
+    vcvarsall = find_vcvarsall()
+    if not vcvarsall:
+        return None
+
+    vs_arch = 'x86' if bits_32 else 'x86_amd64'
+    print(f'Running "{vcvarsall}" {vs_arch}')
+    result = subprocess.run(f'"{vcvarsall}" {vs_arch} & set', shell=True, capture_output=True, text=True)
+    return dict(line.split('=', 1) for line in result.stdout.splitlines() if '=' in line)
+
+
+def probe_toolchain(save: bool = True) -> dict:
+    """
+    Discover the build tools, Python installs and SDKs on this machine, probing them all at once. The results are
+    cached in toolchain_file, and reused by later runs for as long as the toolchain_key() stays the same, so that
+    they don't have to run every tool again. With save unset, new results aren't cached.
+    """
+    commands = toolchain_commands()
+    key = toolchain_key(commands)
+    if os.path.exists(toolchain_file):
+        with open(toolchain_file, 'r') as f:
+            cached = json.load(f)
+        if cached.get('key') == key:
+            return cached
+
+    start = time.perf_counter()
+    with concurrent.futures.ThreadPoolExecutor(16, thread_name_prefix='toolchain') as pool:
+        tools = {name: pool.submit(probe_tool, *command) for name, command in commands.items()}
+        pythons = {version: pool.submit(probe_python, python) for version, python in python_candidates().items()}
+        vs_env = pool.submit(vs_environment) if windows else None
+
+        probed = {'key': key,
+                  'tools': {name: tool.result() for name, tool in tools.items() if tool.result()},
+                  'python': {version: python.result() for version, python in pythons.items() if python.result()},
+                  'vs_environment': vs_env.result() if vs_env else None,
+                  'macos_version': mac_plat.mac_ver()[0] if macos else ''}
+
+    print(f'-- Probed {len(probed["tools"])} build tools and {len(probed["python"])} Python installs in '
+          f'{time.perf_counter() - start:.1f} s')
+    if not save:
+        return probed
+    os.makedirs(cache_path, exist_ok=True)
+    with open(f'{toolchain_file}.tmp', 'w') as f:
+        json.dump(probed, f, indent=1)
+    os.replace(f'{toolchain_file}.tmp', toolchain_file)
+    return probed
+
+
+def toolchain_info() -> dict:
+    """
+    Get the results of probing the toolchain, probing it (or loading the cached results) the first time.
+    """
+    if not toolchain:
+        toolchain.update(probe_toolchain())
+    return toolchain
+
+
+def macos_sdk() -> str:
+    """
+    Get the macOS SDK to build against: the one in versions if it is installed, or else the SDK that xcrun
+    reported to the toolchain probe.
+    """
+    if os.path.isdir(osx_sdk):
+        return osx_sdk
+
+    xcrun = toolchain_info()['tools'].get('xcrun')
+    return xcrun['version'] if xcrun and xcrun['version'] else osx_sdk
+
+
+def compiler_identity(compiler: str) -> str:
+    """
+    Describe a compiler by its resolved location, modification time and reported version, so that upgrading or
+    swapping the compiler is noticed even when its name stays the same. The compilers in CC and CXX come from the
+    toolchain probe rather than being run again.
+    """
+    for name, tool in toolchain_info()['tools'].items():
+        if name in ('cc', 'c++') and toolchain_commands()[name][0] == compiler:
+            return f'{tool["path"]} {tool["mtime"]} {tool["version"]}'
+
+    compiler_exe = shutil.which(compiler.split()[0]) if compiler else None
+    if compiler_exe is None:
+        return f'{compiler}: not found'
+
+    try:
+        version = subprocess.run(f'{compiler} --version', shell=True, capture_output=True, text=True).stdout
+    except OSError:
+        version = ''
+
+    return f'{os.path.realpath(compiler_exe)} {os.path.getmtime(compiler_exe)} {version}'
+
+
+def toolchain_fingerprint(flags: str = '') -> str:
+    """
+    Generate a short hash identifying the compilers, flags and platform that a configure script will probe.
+    """
+    fingerprint = hashlib.sha256(plat.encode())
+    for compiler_var, default in (('CC', 'cc'), ('CXX', 'c++')):
+        fingerprint.update(compiler_identity(os.getenv(compiler_var, default)).encode())
+
+    for flags_var in ('CFLAGS', 'CXXFLAGS', 'CPPFLAGS', 'LDFLAGS', 'LIBS'):
+        fingerprint.update(f'{flags_var}={os.getenv(flags_var, "")}'.encode())
+
+    # Optimisation and debug levels don't change the results of feature checks, so leave them out to let the
+    # debug and release configures of a library share their results
+    probe_flags = [flag for flag in flags.split() if not flag.startswith(('-O', '-g'))]
+    fingerprint.update(' '.join(probe_flags).encode())
+
+    return fingerprint.hexdigest()[:16]
+
+
+def autoconf_cache(flags: str = '') -> str:
+    """
+    Get the shared autoconf cache folder for the current toolchain, creating it and its config.site if needed.
+    A change of compiler or flags gives a new fingerprint, so stale results are never reused.
+    """
+    cache_dir = f'{cache_path}/autoconf/{toolchain_fingerprint(flags)}'
+    config_site = f'{cache_dir}/config.site'
+    if not os.path.exists(config_site):
+        os.makedirs(cache_dir, exist_ok=True)
+        with open(config_site, 'w') as f:
+            f.write('# Shared autoconf results for one toolchain, generated by config-cmdline.py\n'
+                    f'if test -r "{cache_dir}/config.cache"; then\n'
+                    f'  . "{cache_dir}/config.cache"\n'
+                    'fi\n')
+
+    return cache_dir
+
+
+def merge_autoconf_cache(run_cache: str, cache_dir: str):
+    """
+    Copy the feature-check results of one configure run into the shared cache of its toolchain.
+    """
+    if not os.path.exists(run_cache):
+        return
+
+    # Cache lines look like either "var=${var=value}" or "test "${var+set}" = set || var='value'"
+    cache_var = re.compile(r'^(?:test "\$\{)?(\w+_cv_\w+)')
+
+    shared_cache = f'{cache_dir}/config.cache'
+    results: dict[str, str] = {}
+    for cache_file in (shared_cache, run_cache):
+        if not os.path.exists(cache_file):
+            continue
+        with open(cache_file, 'r') as f:
+            for line in f.read().splitlines():
+                match = cache_var.match(line)
+                # ac_cv_env_* records the flags of a single run, and results containing depends paths (e.g. the
+                # location of a package's own install-sh) only make sense for the package that found them
+                if match is None or match.group(1).startswith('ac_cv_env_') or depends_dir in line:
+                    continue
+                results[match.group(1)] = line
+
+    with open(f'{shared_cache}.tmp', 'w') as f:
+        f.write('\n'.join(results[var] for var in sorted(results)) + '\n')
+    os.replace(f'{shared_cache}.tmp', shared_cache)
+
+
+def run_configure(configure_script: str, configure_args: str, log_name: str, flags: str = '') -> int:
+    """
+    Run an autoconf configure script with the shared cache of the current toolchain, so that feature checks
+    already made by an earlier configure (of this or another dependency) are answered instantly.
+    Returns the exit status of the configure script.
+    """
+    cache_dir = autoconf_cache(flags)
+    run_cache = f'{cache_dir}/{log_name}.cache'
+    os.environ['CONFIG_SITE'] = f'{cache_dir}/config.site'
+
+    start = time.perf_counter()
+    configure_flag = os.system(f'{configure_script} {configure_args} --cache-file="{run_cache}" > '
+                               f'"{logs_path}/{log_name}.log" 2>&1')
+    if configure_flag == 0:
+        merge_autoconf_cache(run_cache, cache_dir)
+        # e.g. "xerces_configure_debug" is the configure_debug step of xerces
+        dependency, step = log_name.lower().split('_', 1)
+        record_build_time(dependency, step, time.perf_counter() - start, report=False)
+    else:
+        print(triage_log(f'{logs_path}/{log_name}.log'))
+
+    return configure_flag
+
+
+def build_location(dependency: str, default_path: str) -> str:
+    """
+    Choose where to put the out-of-source build folder of a dependency. If a scratch location has been set in the
+    options and has enough free space, the build folder goes there; otherwise it stays at default_path, next to the
+    sources. Installs always go to the usual *-install folders whichever is used.
+    """
+    scratch_dir = options['scratch_dir']
+    if not scratch_dir:
+        return default_path
+
+    if scratch_dir == 'auto':
+        candidates = [path for path in ('/dev/shm', os.getenv('TMPDIR'), '/tmp') if path]
+    else:
+        candidates = [scratch_dir]
+
+    needed = build_sizes.get(dependency, 1.0) * 1e9
+    for candidate in candidates:
+        if not os.path.isdir(candidate) or not os.access(candidate, os.W_OK):
+            print(f'-- Scratch location {candidate} is not a writable folder')
+            continue
+
+        free = shutil.disk_usage(candidate).free
+        if free < needed:
+            print(f'-- Scratch location {candidate} has {free / 1e9:.1f} GB free but {dependency} needs about '
+                  f'{needed / 1e9:.1f} GB')
+            continue
+
+        # Keep the builds of different GMAT checkouts apart
+        scratch_path = f'{candidate}/gmat-depends-{checkout_id}/{dependency}/{os.path.basename(default_path)}'
+        print(f'-- Building {dependency} in {scratch_path}')
+        return scratch_path
+
+    print(f'-- No usable scratch location, so building {dependency} in {default_path}')
+    return default_path
+
+
+# Background deletion of build folders, so that the next dependency can start building straight away
+cleanup_pool = concurrent.futures.ThreadPoolExecutor(max_workers=4, thread_name_prefix='cleanup')
+cleanup_jobs: list[concurrent.futures.Future] = []
+trash_dirs: set[str] = set()
+
+
+def remove_tree(path: str):
+    """
+    Delete a folder without waiting for it. The folder is moved into a .trash folder beside it at once, so its
+    original path is free again, and its contents are deleted in parallel in the background. Call finish_cleanup()
+    to wait for the deletions to complete.
+    """
+    if os.path.islink(path):
+        os.remove(path)  # e.g. an install linked to a system copy, whose contents must be left alone
+        return
+    if not os.path.exists(path):
+        return
+
+    # Renaming is only instant within the same file system, so keep the trash folder next to the original
+    trash_dir = f'{os.path.dirname(os.path.normpath(path))}/.trash'
+    trash_path = f'{trash_dir}/{os.path.basename(os.path.normpath(path))}-{os.getpid()}-{len(cleanup_jobs)}'
+    try:
+        os.makedirs(trash_dir, exist_ok=True)
+        trash_dirs.add(trash_dir)
+        os.rename(path, trash_path)
+    except OSError:
+        # Couldn't move it aside (e.g. a file is locked on Windows), so delete it now. It mustn't be left to the
+        # background, which would delete whatever is installed at the path in the meantime.
+        shutil.rmtree(path)
+        return
+
+    with os.scandir(trash_path) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                cleanup_jobs.append(cleanup_pool.submit(shutil.rmtree, entry.path, ignore_errors=True))
+            else:
+                cleanup_jobs.append(cleanup_pool.submit(os.remove, entry.path))
+    trash_dirs.add(trash_path)
+
+
+def remove_build_dir(build_path: str):
+    """
+    Delete an out-of-source build folder in the background, unless build folders are being kept.
+    """
+    if options['keep_build']:
+        print(f'-- Keeping build folder {build_path}')
+        return
+
+    remove_tree(build_path)
+
+
+def finish_cleanup():
+    """
+    Wait for all background deletions to complete, then remove the emptied trash folders.
+    """
+    if cleanup_jobs:
+        print('\n-- Waiting for build folder cleanup to finish...')
+    for job in concurrent.futures.as_completed(cleanup_jobs):
+        if job.exception() is not None and not isinstance(job.exception(), FileNotFoundError):
+            print(f'-- Cleanup error: {job.exception()}')
+    cleanup_jobs.clear()
+
+    # Deepest paths first, so each .trash folder is removed after the trees inside it
+    for trash_path in sorted(trash_dirs, key=len, reverse=True):
+        shutil.rmtree(trash_path, ignore_errors=True)
+    trash_dirs.clear()
+
+
+def profile_flags() -> tuple[str, str]:
+    """
+    Get the release compiler and linker flags of the selected build profile, adjusted for the current compiler.
+    """
+    profile_name = options['build_profile']
+    profile = build_profiles.get(profile_name)
+    if profile is None:
+        raise ValueError(f'build_profile "{profile_name}" not recognised - use one of {", ".join(build_profiles)}')
+
+    if windows:
+        return profile['msvc'], '/LTCG' if '/GL' in profile['msvc'] else ''
+
+    arch = profile['arch']
+    if arch == '-march=native' and mac_plat.machine() == 'arm64':
+        arch = '-mcpu=native'  # Apple Silicon compilers don't accept -march=native
+
+    lto = profile['lto']
+    if lto and 'clang' not in compiler_identity(os.getenv('CC', 'cc')):
+        lto += ' -ffat-lto-objects'  # GCC: keep regular object code so the static libraries link without LTO too
+
+    compile_flags = ' '.join(flag for flag in (profile['opt'], arch, lto) if flag)
+    link_flags = f'{profile["opt"]} {arch} {lto}' if lto else ''
+    return compile_flags, link_flags
+
+
+@functools.lru_cache(maxsize=None)
+def native_target() -> str:
+    """
+    Find the CPU that -march=native (or -mcpu=native) targets on this machine, e.g. "skylake", so that libraries
+    built for it aren't shared with machines that have other CPUs. GCC reports it with -Q --help=target and Clang
+    passes it to its compiler stage as -target-cpu. If it can't be found, the machine's name stands in for it.
+    """
+    compiler = os.getenv('CC', 'cc')
+    arch = profile_flags()[0].split()
+    arch_flag = next((flag for flag in arch if flag.endswith('=native')), '-march=native')
+    arch_option = arch_flag.split('=')[0]  # e.g. "-march"
+    for command, pattern in ((f'{compiler} {arch_flag} -Q --help=target', rf'^\s*{arch_option}=[ \t]+(\S+)'),
+                             (f'{compiler} {arch_flag} -### -c -x c -', r'"-target-cpu" "([^"]+)"')):
+        try:
+            result = subprocess.run(command, shell=True, capture_output=True, text=True, input='', timeout=60)
+        except (OSError, subprocess.TimeoutExpired):
+            continue
+        match = re.search(pattern, result.stdout + result.stderr, re.M)
+        if match:
+            return match.group(1)
+
+    return f'host {mac_plat.node()}'
+
+
+def profile_configure_flags() -> str:
+    """
+    Get the configure arguments that apply the build profile and the selected linker to a dependency that otherwise
+    uses its own defaults. The baseline profile leaves the compiler flags alone.
+    """
+    if options['build_profile'] == 'baseline':
+        return f'LDFLAGS="{linker_flags()}"' if linker_flags() else ''
+
+    compile_flags, link_flags = profile_flags()
+    return f'CFLAGS="{compile_flags}" CXXFLAGS="{compile_flags}" LDFLAGS="{link_flags} {linker_flags()}"'
+
+
+def linker_works(linker: str) -> bool:
+    """
+    Smoke test a linker with the compiler and release flags about to be used, by linking a small shared library
+    and a program that uses it, then running the program.
+    """
+    compiler = os.getenv('CC', 'cc')
+    compile_flags, link_flags = profile_flags()
+    shared_flag, lib_ext = ('-dynamiclib', 'dylib') if macos else ('-shared', 'so')
+    log_file = f'{logs_path}/linker_smoke_test.log'
+
+    with tempfile.TemporaryDirectory() as test_dir:
+        with open(f'{test_dir}/lib.c', 'w') as f:
+            f.write('int gmat_linker_test(void) { return 42; }\n')
+        with open(f'{test_dir}/main.c', 'w') as f:
+            f.write('int gmat_linker_test(void);\nint main(void) { return gmat_linker_test() == 42 ? 0 : 1; }\n')
+
+        with open(log_file, 'a') as log:
+            log.write(f'\n---------- {linker} ----------\n')
+            for command in (f'{compiler} {compile_flags} -fPIC {shared_flag} {link_flags} -fuse-ld={linker} lib.c '
+                            f'-o libgmat_linker_test.{lib_ext}',
+                            f'{compiler} {compile_flags} {link_flags} -fuse-ld={linker} main.c -L. '
+                            f'-lgmat_linker_test -Wl,-rpath,"{test_dir}" -o main',
+                            './main'):
+                log.flush()
+                if subprocess.run(command, shell=True, cwd=test_dir, stdout=log, stderr=log).returncode != 0:
+                    return False
+
+    return True
+
+
+@functools.lru_cache(maxsize=None)
+def linker_flags() -> str:
+    """
+    Get the linker flags that select the linker given by the linker option. With "auto", the fastest linker in
+    fast_linkers that is installed and passes a smoke test is used, falling back to the compiler's default.
+    """
+    choice = options['linker']
+    if windows or choice == 'default':
+        return ''
+    if choice != 'auto' and choice not in fast_linkers:
+        raise ValueError(f'linker "{choice}" not recognised - use "auto", "default" or one of {", ".join(fast_linkers)}')
+
+    for linker in fast_linkers if choice == 'auto' else [choice]:
+        if not any(linker_exe in toolchain_info()['tools'] for linker_exe in fast_linkers[linker]):
+            if choice != 'auto':
+                print(f'-- Linker {linker} was selected but isn\'t installed')
+            continue
+
+        if linker_works(linker):
+            print(f'-- Linking with {linker}')
+            return f'-fuse-ld={linker}'
+        print(f'-- Linker {linker} failed its smoke test, so not using it. See {logs_path}/linker_smoke_test.log')
+
+    print('-- Linking with the default linker')
+    return ''
+
+
+def uses_pgo(dependency: str, release: bool) -> bool:
+    """
+    Check whether a dependency's release library gets a profile-guided optimisation build (see pgo_build()).
+    """
+    return options['pgo'] and release and not windows and dependency.lower() in pgo_dependencies
+
+
+def profile_description(pgo: bool = False) -> str:
+    """
+    Describe the selected build profile and the flags it gives with the current compiler, and whether the library
+    was built with profile-guided optimisation.
+    """
+    compile_flags, link_flags = profile_flags()
+    description = f'{options["build_profile"]}: {compile_flags} | {link_flags}'
+    return f'{description} | pgo\n' if pgo else f'{description}\n'
+
+
+def installed_profile(install_path: str) -> str:
+    """
+    Get the build profile description an existing install was built with.
+    """
+    stamp_file = f'{install_path}/build-profile.txt'
+    if os.path.exists(stamp_file):
+        with open(stamp_file, 'r') as f:
+            return f.read()
+    elif options['build_profile'] == 'baseline':
+        return profile_description()  # installs from before build profiles were introduced used the baseline flags
+    else:
+        return 'baseline: (not recorded)\n'
+
+
+def profile_matches(dependency: str, install_path: str, build_paths: tuple[str, ...] = (), pgo: bool = False) -> bool:
+    """
+    Check whether an existing install was built with the selected build profile (and with PGO, if pgo is set). If
+    it wasn't, the install is removed so that it gets rebuilt, rather than mixing libraries built with different
+    profiles. The folders in build_paths, which hold its object files, are removed too, so that none built with the
+    old flags are reused.
+    """
+    installed = installed_profile(install_path)
+    if installed == profile_description(pgo):
+        return True
+
+    def label(description: str) -> str:
+        name = description.split(':')[0]
+        return f'{name}" with PGO' if description.rstrip().endswith('| pgo') else f'{name}"'
+
+    print(f'-- {dependency} was built with build profile "{label(installed)} but "{label(profile_description(pgo))} '
+          f'is selected, so rebuilding it')
+    remove_tree(install_path)
+    for build_path in build_paths:
+        remove_tree(build_path)
+    return False
+
+
+def write_profile_stamp(install_path: str, pgo: bool = False):
+    """
+    Record the build profile (and whether PGO was used) in an install folder, so later runs can tell how it was
+    built.
+    """
+    os.makedirs(install_path, exist_ok=True)
+    stamp_file = f'{install_path}/build-profile.txt'
+    if os.path.exists(stamp_file):
+        os.remove(stamp_file)  # it may be hardlinked to the store, so mustn't be written in place
+    with open(stamp_file, 'w') as f:
+        f.write(profile_description(pgo))
+
+
+def pgo_flags(stage: str, profile_dir: str) -> str:
+    """
+    Get the compiler flags for the "generate" (instrumented) or "use" (optimised) stage of a profile-guided
+    optimisation build, for GCC or Clang.
+    """
+    clang = 'clang' in compiler_identity(os.getenv('CC', 'cc'))
+    if stage == 'generate':
+        return '-fprofile-instr-generate' if clang else f'-fprofile-generate="{profile_dir}"'
+    elif stage == 'use':
+        return (f'-fprofile-instr-use="{profile_dir}/merged.profdata"' if clang
+                else f'-fprofile-use="{profile_dir}" -Wno-missing-profile')
+    else:
+        raise SyntaxError(f'PGO stage "{stage}" not recognized')
+
+
+def run_training(dependency: str, source: str, link_args: str, profile_dir: str, flags: str = '') -> float:
+    """
+    Compile and run the PGO training workload of a dependency against its installed release library.
+    Returns how long the workload took to run, in seconds.
+    """
+    compiler = os.getenv('CXX', 'c++') if source.endswith('.cpp') else os.getenv('CC', 'cc')
+    driver = f'{profile_dir}/{dependency}_train'
+    log_file = f'{logs_path}/{dependency}_pgo_train.log'
+    compile_flag = os.system(f'{compiler} -O2 {flags} "{source}" {link_args} -o "{driver}" >> "{log_file}" 2>&1')
+    if compile_flag != 0:
+        raise RuntimeError(f'{dependency} PGO training workload failed to compile. See {log_file}')
+
+    env = dict(os.environ, LLVM_PROFILE_FILE=f'{profile_dir}/%p.profraw')
+    start = time.perf_counter()
+    with open(log_file, 'a') as log:
+        result = subprocess.run([driver], cwd=profile_dir, env=env, stdout=log, stderr=subprocess.STDOUT)
+    elapsed = time.perf_counter() - start
+    if result.returncode != 0:
+        raise RuntimeError(f'{dependency} PGO training workload failed. See {log_file}')
+
+    return elapsed
+
+
+def pgo_build(dependency: str, build_release, source: str, link_args: str):
+    """
+    Rebuild a release library using profile-guided optimisation: build an instrumented library, run the
+    dependency's training workload with it, merge the profiles, then build the library again using them.
+    build_release(extra_flags) must build and install the release library with the extra compiler flags.
+    The training workload is timed against the normal and the PGO release libraries. If any stage fails, the plain
+    release library is built again, so that an instrumented library isn't left installed, and the error is raised.
+    """
+    if windows:
+        print(f'-- PGO builds need GCC or Clang, so skipping PGO for {dependency}')
+        return
+
+    profile_dir = f'{cache_path}/pgo/{dependency}'
+    shutil.rmtree(profile_dir, ignore_errors=True)
+    os.makedirs(profile_dir)
+    source = f'{os.path.dirname(os.path.abspath(__file__))}/pgo/{source}'
+    if os.path.exists(f'{logs_path}/{dependency}_pgo_train.log'):
+        os.remove(f'{logs_path}/{dependency}_pgo_train.log')
+
+    print(f'-- Timing {dependency} PGO training workload with the normal release library...')
+    before = run_training(dependency, source, link_args, profile_dir)
+
+    try:
+        print(f'-- Building instrumented {dependency} release library. This could take a while...')
+        generate_flags = pgo_flags('generate', profile_dir)
+        if build_release(generate_flags):  # CSPICE's returns its make status, Xerces' raises on failure
+            raise RuntimeError(f'Instrumented {dependency} release library failed to build')
+        print(f'-- Running {dependency} PGO training workload...')
+        run_training(dependency, source, link_args, profile_dir, generate_flags)
+
+        if 'clang' in compiler_identity(os.getenv('CC', 'cc')):
+            profdata = 'xcrun llvm-profdata' if macos else 'llvm-profdata'
+            merge_flag = os.system(f'{profdata} merge -output="{profile_dir}/merged.profdata" '
+                                   f'"{profile_dir}"/*.profraw >> "{logs_path}/{dependency}_pgo_train.log" 2>&1')
+            if merge_flag != 0:
+                raise RuntimeError(f'Failed to merge {dependency} PGO profiles. Is llvm-profdata installed?')
+
+        print(f'-- Building {dependency} release library with PGO profiles. This could take a while...')
+        if build_release(pgo_flags('use', profile_dir)):
+            raise RuntimeError(f'{dependency} release library failed to build with PGO profiles')
+    except Exception:
+        print(f'-- {dependency} PGO build failed, so rebuilding the plain release library')
+        build_release()
+        raise
+
+    after = run_training(dependency, source, link_args, profile_dir)
+    print(f'-- {dependency} PGO training workload took {before:.2f} s before PGO and {after:.2f} s after '
+          f'({(before - after) / before * 100:.0f}% faster)')
+
+
+def makefile_variables(makefile: str) -> dict[str, str]:
+    """
+    Read the plain variable assignments (e.g. "CXX = g++") of a Makefile generated by configure.
+    """
+    variables = {}
+    with open(makefile, 'r') as f:
+        for line in f:
+            match = re.match(r'^(\w+) = (.*)$', line.rstrip('\n'))
+            # Leave out values that refer to other make variables, which the shell can't expand
+            if match is not None and '$' not in match.group(2):
+                variables[match.group(1)] = match.group(2)
+    return variables
+
+
+def xerces_pch(build_path: str, xerces_path: str, cxx_flags: str) -> str:
+    """
+    Precompile the headers used by most Xerces sources, as Xerces' autotools build can't do it itself. Must be
+    called after configure. Returns the make arguments that have every source include the precompiled headers,
+    which the compiler then loads instead of parsing the headers again.
+    """
+    if not options['pch']:
+        return ''
+
+    variables = makefile_variables(f'{build_path}/src/Makefile')
+    compiler = variables.get('CXX', os.getenv('CXX', 'c++'))
+    pch_dir = f'{build_path}/pch'
+    os.makedirs(pch_dir, exist_ok=True)
+    header = f'{pch_dir}/xerces_pch.hpp'
+    with open(header, 'w') as f:
+        f.write('\n'.join(f'#include <{pch_header}>' for pch_header in xerces_pch_headers) + '\n')
+
+    # GCC and Clang both look for a precompiled header next to a header passed to -include, as .gch and .pch
+    # respectively. Its macros must match those of the sources that use it, so compile it with the same ones.
+    pch_file = f'{header}.pch' if 'clang' in compiler_identity(os.getenv('CXX', 'c++')) else f'{header}.gch'
+    pch_macros = ' '.join(variables.get(var, '') for var in ('DEFS', 'CPPFLAGS', 'PTHREAD_CFLAGS'))
+    pch_flag = os.system(f'{compiler} {pch_macros} {cxx_flags} -I"{build_path}/src" -I"{xerces_path}/src" '
+                         f'-x c++-header "{header}" -o "{pch_file}" > "{logs_path}/xerces_pch.log" 2>&1')
+    if pch_flag != 0:
+        print(f'-- Couldn\'t precompile Xerces headers, so building without them. See {logs_path}/xerces_pch.log')
+        return ''
+
+    return f'CXXFLAGS="{cxx_flags} -include {header} -Winvalid-pch"'
+
+
+def xerces_cmake_pch(build_path: str) -> str:
+    """
+    Get the CMake arguments that switch precompiled headers on or off for the Xerces library (needs CMake 3.19+).
+    """
+    if not options['pch']:
+        return '-DCMAKE_DISABLE_PRECOMPILE_HEADERS=ON'
+
+    # CMake runs this script straight after Xerces' project() call, before the library target exists, so defer
+    # adding the headers until the whole of Xerces' CMakeLists.txt has been read
+    pch_script = f'{build_path}/xerces_pch.cmake'
+    pch_headers = ' '.join(f'<{pch_header}>' for pch_header in xerces_pch_headers)
+    with open(pch_script, 'w') as f:
+        f.write(f'cmake_language(DEFER CALL target_precompile_headers xerces-c PRIVATE {pch_headers})\n')
+
+    return f'-DCMAKE_PROJECT_INCLUDE="{pch_script}"'
+
+
+def hash_file(file_path: str) -> str:
+    """
+    Get the SHA-256 hash of a file's contents, memory-mapping it rather than reading it into memory. Hashing
+    releases the GIL, so files can be hashed in parallel threads.
+    """
+    with open(file_path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return hashlib.sha256().hexdigest()
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as contents:
+            return hashlib.sha256(contents).hexdigest()
+
+
+def hash_install(install_path: str) -> dict[str, str]:
+    """
+    Hash every file in an install folder in parallel, returning the hashes by path relative to the folder.
+    Symbolic links aren't followed.
+    """
+    files = [os.path.join(folder, name) for folder, _, file_names in os.walk(install_path) for name in file_names
+             if not os.path.islink(os.path.join(folder, name))]
+    with concurrent.futures.ThreadPoolExecutor(os.cpu_count() or 1) as pool:
+        hashes = pool.map(hash_file, files)
+    return {os.path.relpath(file_path, install_path): file_hash for file_path, file_hash in zip(files, hashes)}
+
+
+def load_inventory() -> dict:
+    """
+    Load the inventory of what is installed in depends.
+    """
+    if not os.path.exists(inventory_file):
+        return {}
+
+    with open(inventory_file, 'r') as f:
+        return json.load(f)
+
+
+# Downloads running at once add to the inventory, so saving it is serialised
+inventory_lock = threading.Lock()
+
+
+def save_install_record(dependency: str, record: dict):
+    """
+    Add a dependency's install to the inventory, replacing any earlier record of it.
+    """
+    with inventory_lock:
+        inventory = load_inventory()
+        inventory[dependency] = record
+        with open(f'{inventory_file}.tmp', 'w') as f:
+            json.dump(inventory, f, indent=1)
+        os.replace(f'{inventory_file}.tmp', inventory_file)
+
+
+def record_install(dependency: str, install_path: str, debug: bool, release: bool):
+    """
+    Add a finished install of a dependency to the inventory, with what it was built from and how, and the hash of
+    every file in it so that the verify command can later detect changes.
+    """
+    hashes = hash_install(install_path)
+    save_install_record(dependency, {
+        'version': versions.get(dependency, versions.get(dependency.lower(), '')),
+        'configuration': ' and '.join(build_type for build_type, built in (('debug', debug), ('release', release))
+                                      if built),
+        'platform': f'{plat} {cpu_bits}-bit',
+        'profile': installed_profile(install_path).strip(),
+        'build_key': build_key(dependency, debug, release),
+        'install_path': install_path,
+        'files': len(hashes),
+        'size': sum(os.path.getsize(f'{install_path}/{rel_path}') for rel_path in hashes),
+        'date': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'hashes': hashes,
+    })
+
+
+def status():
+    """
+    Show what is installed in depends, from the inventory.
+    """
+    inventory = load_inventory()
+    if not inventory:
+        print('-- Nothing has been installed in depends yet')
+        return
+
+    for dependency, install in inventory.items():
+        missing = '' if os.path.isdir(install['install_path']) else ' (MISSING)'
+        print(f'{dependency:10} {install["version"]:8} {install["configuration"]:17} {install["platform"]:14} '
+              f'{install["files"]:6} files {install["size"] / 1e6:8.1f} MB  {install["date"]}')
+        print(f'{"":10} {install["profile"]}')
+        print(f'{"":10} {install["install_path"]}{missing}')
+
+
+def verify() -> bool:
+    """
+    Re-hash every install in the inventory and report any file that has changed, gone missing or appeared since
+    it was installed. Returns False if any install has changed.
+    """
+    inventory = load_inventory()
+    unchanged = True
+    for dependency, install in inventory.items():
+        if install.get('system'):
+            continue  # not ours to check
+        if not os.path.isdir(install['install_path']):
+            print(f'-- {dependency}: install folder {install["install_path"]} is missing')
+            unchanged = False
+            continue
+
+        start = time.perf_counter()
+        hashes = hash_install(install['install_path'])
+        changed = sorted(rel_path for rel_path, file_hash in install['hashes'].items()
+                         if rel_path in hashes and hashes[rel_path] != file_hash)
+        missing = sorted(install['hashes'].keys() - hashes.keys())
+        added = sorted(hashes.keys() - install['hashes'].keys())
+        if not changed and not missing and not added:
+            print(f'-- {dependency}: {len(hashes)} files OK ({time.perf_counter() - start:.1f} s)')
+            continue
+
+        unchanged = False
+        print(f'-- {dependency}: {len(changed)} changed, {len(missing)} missing and {len(added)} new files')
+        for label, rel_paths in (('changed', changed), ('missing', missing), ('new', added)):
+            for rel_path in rel_paths[:10]:
+                print(f'--   {label}: {rel_path}')
+            if len(rel_paths) > 10:
+                print(f'--   ... and {len(rel_paths) - 10} more {label} files')
+
+    return unchanged
+
+
+def tree_size(path: str) -> int:
+    """
+    Get the total size of the files in a folder, or of a single file. Symbolic links aren't followed.
+    """
+    if not os.path.isdir(path) or os.path.islink(path):
+        return os.lstat(path).st_size if os.path.lexists(path) else 0
+
+    size = 0
+    folders = [path]
+    while folders:
+        with os.scandir(folders.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    folders.append(entry.path)
+                else:
+                    size += entry.stat(follow_symlinks=False).st_size
+    return size
+
+
+def stale_trees() -> dict[str, str]:
+    """
+    Find what in depends (and the scratch locations) the current versions, platform and options no longer use:
+    sources of old versions, trees for other platforms or word sizes, leftover build folders and downloaded
+    archives, and folders awaiting deletion when a run was interrupted. Returns the reason for each path.
+    """
+    stale = {}
+    current_platforms = {plat, plat_folder, 'cocoa' if macos else plat}
+
+    wx_current = f'{depends_paths["wxWidgets"]}/wxWidgets-{versions["wxWidgets"]}'
+    for wx_tree in glob.glob(f'{depends_paths["wxWidgets"]}/wxWidgets-*/'):
+        if os.path.normpath(wx_tree) != wx_current:
+            stale[os.path.normpath(wx_tree)] = 'old wxWidgets version'
+
+    # CSPICE and Java have a folder per platform, and CSPICE one per word size inside that
+    for dependency in ('cspice', 'java'):
+        for plat_tree in glob.glob(f'{depends_paths[dependency]}/*/'):
+            if os.path.basename(os.path.normpath(plat_tree)) != plat_folder:
+                stale[os.path.normpath(plat_tree)] = 'other platform'
+    for cspice_tree in glob.glob(f'{depends_paths["cspice"]}/{plat_folder}/cspice*/'):
+        if os.path.basename(os.path.normpath(cspice_tree)) != f'cspice{cpu_bits}':
+            stale[os.path.normpath(cspice_tree)] = 'other word size'
+
+    # Sources that aren't versioned by their folder name are stale if the inventory has an older version
+    for dependency, install in load_inventory().items():
+        version = versions.get(dependency, versions.get(dependency.lower()))
+        if version and install['version'] != version and os.path.isdir(install['install_path']) and \
+                not install.get('system'):
+            stale[os.path.dirname(install['install_path'])] = f'{dependency} {install["version"]} (now {version})'
+
+    for tree in (depends_paths['xerces'], wx_current, f'{depends_paths["swig"]}/swig'):
+        for plat_dir in glob.glob(f'{tree}/*-build/') + glob.glob(f'{tree}/*-install/'):
+            plat_dir = os.path.normpath(plat_dir)
+            dir_platform, dir_type = os.path.basename(plat_dir).rsplit('-', 1)
+            if dir_platform not in current_platforms:
+                stale[plat_dir] = 'other platform'
+            elif dir_type == 'build' and not options['keep_build']:
+                stale[plat_dir] = 'leftover build folder'
+
+    for trash_dir in (glob.glob(f'{depends_dir}/*/.trash') + glob.glob(f'{depends_dir}/*/*/.trash') +
+                      glob.glob(f'{depends_dir}/*/*/*/.trash')):
+        stale[trash_dir] = 'interrupted deletion'
+
+    if not options['keep_build']:
+        for scratch_dir in {'/dev/shm', os.getenv('TMPDIR') or '/tmp', '/tmp', options['scratch_dir']} - {'', 'auto'}:
+            if os.path.isdir(f'{scratch_dir}/gmat-depends-{checkout_id}'):
+                stale[f'{scratch_dir}/gmat-depends-{checkout_id}'] = 'leftover build folder'
+
+    for archive in ('xerces.tar.gz', 'wxWidgets/wxWidgets.tar.bz2', 'cspice/*/cspice*.zip', 'cspice/*/cspice.tar*',
+                    'swig/swig.tar.gz', 'swig/swig.zip', 'java/*/jdk.tar.gz', 'java/*/jdk.zip'):
+        for archive_file in glob.glob(f'{depends_dir}/{archive}'):
+            stale[archive_file] = 'leftover download'
+
+    # Leave out paths inside other stale paths, which are deleted with them
+    return {path: reason for path, reason in stale.items()
+            if not any(path.startswith(f'{other}{os.sep}') or path.startswith(f'{other}/') for other in stale)}
+
+
+def collect_garbage(budget: float = 0.0):
+    """
+    Delete everything stale_trees() finds, reporting how much space each frees. With a budget in GB, only do so if
+    depends takes up more than the budget, and warn if it still does afterwards. Deletion is done in parallel in
+    the background; call finish_cleanup() to wait for it.
+    """
+    if budget:
+        with concurrent.futures.ThreadPoolExecutor(8) as pool:
+            depends_size = sum(pool.map(tree_size, glob.glob(f'{depends_dir}/*')))
+        if depends_size <= budget * 1e9:
+            return
+        print(f'-- depends takes up {depends_size / 1e9:.1f} GB, over its budget of {budget:.1f} GB')
+
+    stale = stale_trees()
+    with concurrent.futures.ThreadPoolExecutor(8) as pool:
+        sizes = dict(zip(stale, pool.map(tree_size, stale)))
+
+    for path, reason in sorted(stale.items()):
+        print(f'-- Removing {path} ({reason}, {sizes[path] / 1e6:.1f} MB)')
+        if os.path.isdir(path) and not os.path.islink(path):
+            remove_tree(path)
+        else:
+            os.remove(path)
+
+    with inventory_lock:
+        inventory = load_inventory()
+        if any(not os.path.isdir(install['install_path']) for install in inventory.values()):
+            inventory = {dependency: install for dependency, install in inventory.items()
+                         if os.path.isdir(install['install_path'])}
+            with open(f'{inventory_file}.tmp', 'w') as f:
+                json.dump(inventory, f, indent=1)
+            os.replace(f'{inventory_file}.tmp', inventory_file)
+
+    freed = sum(sizes.values())
+    print(f'-- Reclaimed {freed / 1e9:.2f} GB from {len(stale)} stale folders and files')
+    if budget and depends_size - freed > budget * 1e9:
+        print(f'-- depends still takes up {(depends_size - freed) / 1e9:.1f} GB, over its budget of {budget:.1f} GB. '
+              f'Consider moving builds to a scratch location, or the store_dir option')
+
+
+def gc():
+    """
+    Delete the trees in depends that the current versions and platform no longer use.
+    """
+    collect_garbage()
+    finish_cleanup()
+
+
+def build_key(dependency: str, debug: bool, release: bool) -> str:
+    """
+    Generate a hash identifying everything that determines what a dependency build installs: its version, the
+    platform and toolchain, the build profile and other options in build_key_options, and the build types.
+    """
+    key = hashlib.sha256(f'{dependency} {versions.get(dependency, "")} {plat} {cpu_bits} {debug} {release}'.encode())
+    key.update(profile_description().encode())
+    if '=native' in profile_description():
+        key.update(native_target().encode())  # libraries built for this CPU may not run on others
+    key.update(toolchain_fingerprint().encode())
+    key.update(' '.join(f'{option}={options[option]}' for option in build_key_options).encode())
+    return key.hexdigest()[:32]
+
+
+def store_path() -> str:
+    """
+    Get the location of the store that dependency installs are shared through, or '' if the store isn't used.
+    """
+    if options['store_dir'] != 'auto':
+        return options['store_dir']
+
+    user_cache = os.getenv('LOCALAPPDATA') if windows else os.getenv('XDG_CACHE_HOME',
+                                                                      os.path.expanduser('~/.cache'))
+    return f'{user_cache}/gmat-depends-store'
+
+
+def link_or_copy(source: str, destination: str):
+    """
+    Hardlink a file, or copy it if a hardlink isn't possible (e.g. across file systems). The destination is
+    replaced atomically.
+    """
+    if os.path.exists(destination) and os.path.samefile(source, destination):
+        return  # already linked, and renaming a link over another link to the same file would do nothing
+
+    temp_path = f'{destination}.{os.getpid()}.tmp'
+    try:
+        os.link(source, temp_path)
+    except OSError:
+        shutil.copy2(source, temp_path)
+    os.replace(temp_path, destination)
+
+
+def store_file(store: str, file_path: str, install_path: str) -> list:
+    """
+    Add a file of an install to the store, returning its manifest entry. A file already in the store is replaced by
+    a hardlink to the stored copy, and a new file is hardlinked into the store, so each file is kept only once.
+    Stored files are made read-only, as every install using them shares them. Text files that refer to the install
+    folder, like libtool and pkg-config files, are stored with the folder replaced by a placeholder.
+    """
+    executable = os.stat(file_path).st_mode & 0o111
+    with open(file_path, 'rb') as f:
+        contents = f.read()
+
+    install_prefix = install_path.encode()
+    if install_prefix not in contents:
+        kind = 'file'
+    elif b'\0' in contents:
+        kind = 'fixed'  # a binary that refers to its install folder, so can't be used from another folder
+    else:
+        contents = contents.replace(install_prefix, b'@GMAT_INSTALL_PREFIX@')
+        kind = 'relocated'
+
+    object_name = f'{hashlib.sha256(contents).hexdigest()}{"-x" if executable else ""}'
+    object_path = f'{store}/objects/{object_name[:2]}/{object_name}'
+    if not os.path.exists(object_path):
+        os.makedirs(os.path.dirname(object_path), exist_ok=True)
+        temp_path = f'{object_path}.{os.getpid()}.tmp'
+        if kind != 'relocated':
+            link_or_copy(file_path, temp_path)
+        else:
+            with open(temp_path, 'wb') as f:
+                f.write(contents)
+        os.chmod(temp_path, 0o555 if executable else 0o444)
+        os.replace(temp_path, object_path)
+
+    if kind != 'relocated':
+        link_or_copy(object_path, file_path)
+    return [kind, os.path.relpath(file_path, install_path), object_name, executable]
+
+
+def unshare_install(install_path: str):
+    """
+    Replace each file of an install that is hardlinked to a stored copy with a writable copy of its own, so that a
+    build or anything else writing into the install can't change the stored copy, which other installs share.
+    """
+    for folder, _, file_names in os.walk(install_path):
+        for name in file_names:
+            file_path = os.path.join(folder, name)
+            file_stat = os.lstat(file_path)
+            if not stat.S_ISREG(file_stat.st_mode) or file_stat.st_nlink < 2:
+                continue
+
+            temp_path = f'{file_path}.{os.getpid()}.tmp'
+            shutil.copyfile(file_path, temp_path)
+            os.chmod(temp_path, 0o755 if file_stat.st_mode & 0o111 else 0o644)
+            os.replace(temp_path, file_path)
+
+
+@contextlib.contextmanager
+def store_lock(store: str):
+    """
+    Hold the store's lock file while its roots are changed, as every checkout sharing the store changes them. A
+    lock left behind by a run that was killed is broken after a minute.
+    """
+    os.makedirs(store, exist_ok=True)
+    lock_file = f'{store}/roots.lock'
+    while True:
+        try:
+            lock_fd = os.open(lock_file, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            break
+        except FileExistsError:
+            try:
+                if time.time() - os.path.getmtime(lock_file) > 60:
+                    print(f'-- Breaking the stale store lock {lock_file}')
+                    os.remove(lock_file)
+                    continue
+            except FileNotFoundError:
+                continue  # released in the meantime
+            time.sleep(0.05)
+
+    try:
+        yield
+    finally:
+        os.close(lock_fd)
+        os.remove(lock_file)
+
+
+def write_root(root_file: str, root: dict):
+    """
+    Save a checkout's record of its installs in the store, replacing the old record at once. Call with the store's
+    lock held.
+    """
+    with open(f'{root_file}.{os.getpid()}.tmp', 'w') as f:
+        json.dump(root, f, indent=1)
+    os.replace(f'{root_file}.{os.getpid()}.tmp', root_file)
+
+
+def register_install(store: str, install_path: str, key: str):
+    """
+    Record that this checkout has an install populated from (or being added to) a stored tree, so the store's
+    garbage collection keeps the tree while the install exists.
+    """
+    os.makedirs(f'{store}/roots', exist_ok=True)
+    root_file = f'{store}/roots/{checkout_id}.json'
+    with store_lock(store):
+        root = {'depends_dir': depends_dir, 'installs': {}}
+        if os.path.exists(root_file):
+            with open(root_file, 'r') as f:
+                root = json.load(f)
+
+        root['installs'][install_path] = key
+        write_root(root_file, root)
+
+
+def store_install(dependency: str, install_path: str, debug: bool, release: bool):
+    """
+    Add a finished install of a dependency to the store, so other checkouts (or this one, after the install is
+    deleted) can populate the same install from it instead of building it.
+    """
+    store = store_path()
+    if not store:
+        return
 
-    def download_wxwidgets():
-        # Download wxWidgets if it doesn't already exist
-        wxwidgets_path = depends_paths['wxWidgets']
-        version = versions['wxWidgets']
+    print(f'-- Adding {dependency} to the store at {store}')
+    key = build_key(dependency, debug, release)
+    # Registered first, so that the store's garbage collection can't remove the tree as soon as it's written
+    register_install(store, install_path, key)
+    manifest = {'dependency': dependency, 'install_path': install_path, 'entries': []}
+    files = []
+    for folder, dir_names, file_names in os.walk(install_path):
+        manifest['entries'].append(['dir', os.path.relpath(folder, install_path), '', 0])
+        for name in dir_names + file_names:
+            item_path = os.path.join(folder, name)
+            if os.path.islink(item_path):
+                target = os.readlink(item_path).replace(install_path, '@GMAT_INSTALL_PREFIX@')
+                manifest['entries'].append(['link', os.path.relpath(item_path, install_path), target, 0])
+            elif name in file_names:
+                files.append(item_path)
+
+    # Hashing releases the GIL, so files are stored in parallel
+    with concurrent.futures.ThreadPoolExecutor(os.cpu_count() or 1) as pool:
+        manifest['entries'] += pool.map(store_file, [store] * len(files), files, [install_path] * len(files))
+
+    os.makedirs(f'{store}/trees', exist_ok=True)
+    with open(f'{store}/trees/{key}.json.{os.getpid()}.tmp', 'w') as f:
+        json.dump(manifest, f)
+    os.replace(f'{store}/trees/{key}.json.{os.getpid()}.tmp', f'{store}/trees/{key}.json')
+
+
+def restore_install(dependency: str, install_path: str, debug: bool, release: bool) -> bool:
+    """
+    Populate a dependency's install folder from the store, if the store has a tree with the same build key.
+    Files are hardlinked from the store, apart from those that refer to the install folder, which are written
+    with the new folder in place. Returns True if the install was populated.
+    """
+    store = store_path()
+    key = build_key(dependency, debug, release)
+    manifest_file = f'{store}/trees/{key}.json'
+    if not store or not os.path.exists(manifest_file):
+        return False
 
-        # Download wxWidgets if it doesn't already exist
-        if os.path.exists(wxwidgets_path):
-            print('-- wxWidgets already downloaded')
-            return
+    try:
+        with open(manifest_file, 'r') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return False  # removed by the store's garbage collection in the meantime, or damaged
+    if any(kind == 'fixed' for kind, _, _, _ in manifest['entries']) and manifest['install_path'] != install_path:
+        print(f'-- The stored {dependency} can only be used from {manifest["install_path"]}')
+        return False
+
+    # The install is only touched once all its files are known to be in the store
+    missing = [rel_path for kind, rel_path, data, _ in manifest['entries']
+               if kind in ('file', 'fixed', 'relocated') and not os.path.exists(f'{store}/objects/{data[:2]}/{data}')]
+    if missing:
+        print(f'-- The stored {dependency} is missing {len(missing)} files (e.g. {missing[0]}), so not using it')
+        return False
+
+    start = time.perf_counter()
+    remove_tree(install_path)
+    try:
+        for kind, rel_path, data, executable in manifest['entries']:
+            item_path = os.path.normpath(os.path.join(install_path, rel_path))
+            object_path = f'{store}/objects/{data[:2]}/{data}'
+            if kind == 'dir':
+                os.makedirs(item_path, exist_ok=True)
+            elif kind == 'link':
+                os.symlink(data.replace('@GMAT_INSTALL_PREFIX@', install_path), item_path)
+            elif kind in ('file', 'fixed'):
+                link_or_copy(object_path, item_path)
+            elif kind == 'relocated':
+                with open(object_path, 'rb') as f:
+                    contents = f.read().replace(b'@GMAT_INSTALL_PREFIX@', install_path.encode())
+                with open(item_path, 'wb') as f:
+                    f.write(contents)
+                os.chmod(item_path, 0o755 if executable else 0o644)
+    except OSError as error:
+        # e.g. a file removed from the store since it was checked, so build the dependency instead
+        print(f'-- Couldn\'t install {dependency} from the store: {error}')
+        remove_tree(install_path)
+        return False
+
+    register_install(store, install_path, key)
+    print(f'-- {dependency} installed from the store in {time.perf_counter() - start:.1f} s')
+    return True
+
+
+def store_gc():
+    """
+    Remove everything from the store that no existing install uses: the trees of installs that have since been
+    deleted (or whose checkout has), and the files that only those trees contained.
+    """
+    store = store_path()
+    if not store or not os.path.isdir(store):
+        print('-- No store to clean up. Set the store_dir option to the store location')
+        return
 
-        if not os.path.exists(f'{wxwidgets_path}/wxWidgets-{version}'):
-            # Create & change directories
-            if not os.path.exists(wxwidgets_path):
-                os.mkdir(wxwidgets_path)
-            os.chdir(wxwidgets_path)
+    # Other checkouts register installs as they go, so the roots and trees are checked with the store locked
+    live_keys = set()
+    live_objects = set()
+    removed_trees = 0
+    with store_lock(store):
+        for root_file in glob.glob(f'{store}/roots/*.json'):
+            with open(root_file, 'r') as f:
+                root = json.load(f)
+            root['installs'] = {install: key for install, key in root['installs'].items() if os.path.isdir(install)}
+            if not root['installs']:
+                os.remove(root_file)
+                continue
+            live_keys.update(root['installs'].values())
+            write_root(root_file, root)
+
+        for manifest_file in glob.glob(f'{store}/trees/*.json'):
+            if os.path.basename(manifest_file)[:-len('.json')] not in live_keys:
+                os.remove(manifest_file)
+                removed_trees += 1
+                continue
+            with open(manifest_file, 'r') as f:
+                live_objects.update(data for kind, _, data, _ in json.load(f)['entries'] if kind != 'link')
+
+    # Files added in the last hour are kept too, as they may belong to a tree that is still being written
+    removed_objects = freed = 0
+    for object_path in glob.glob(f'{store}/objects/*/*'):
+        object_stat = os.stat(object_path)
+        if os.path.basename(object_path) not in live_objects and \
+                time.time() - max(object_stat.st_mtime, object_stat.st_ctime) > 3600:
+            freed += os.path.getsize(object_path)
+            os.remove(object_path)
+            removed_objects += 1
+    for object_dir in glob.glob(f'{store}/objects/*/'):
+        if not os.listdir(object_dir):
+            os.rmdir(object_dir)
+
+    print(f'-- Removed {removed_trees} unused trees and {removed_objects} unused files from the store '
+          f'({freed / 1e6:.1f} MB freed)')
+
+
+# One HTTP connection to the binary cache per transfer thread, kept open between requests
+binary_cache_connections = threading.local()
+
+
+def binary_cache_request(method: str, path: str, body: bytes = None, headers: dict = None) -> tuple[int, bytes]:
+    """
+    Make a request to the binary cache over the calling thread's pooled connection. Returns the response status
+    and body.
+    """
+    cache_url = urllib.parse.urlsplit(options['binary_cache'])
+    for attempt in range(2):
+        connection = getattr(binary_cache_connections, 'connection', None)
+        if connection is None:
+            connection_type = http.client.HTTPSConnection if cache_url.scheme == 'https' else http.client.HTTPConnection
+            connection = connection_type(cache_url.hostname, cache_url.port, timeout=60)
+            binary_cache_connections.connection = connection
 
-            # Download wxWidgets source
-            print(f'\nDownloading wxWidgets {version}...')
-            os.system(f'curl -L https://github.com/wxWidgets/wxWidgets/releases/download/'
-                      f'v{version}/wxWidgets-{version}.tar.bz2 > wxWidgets.tar.bz2')
-            with tarfile.open('wxWidgets.tar.bz2', 'r:bz2') as tar:
-                tar.extractall()
-            os.remove('wxWidgets.tar.bz2')
+        try:
+            connection.request(method, f'{cache_url.path.rstrip("/")}{path}', body=body, headers=headers or {})
+            response = connection.getresponse()
+            return response.status, response.read()
+        except (http.client.HTTPException, OSError):
+            # The server may have closed a pooled connection since it was last used, so retry once on a new one
+            connection.close()
+            binary_cache_connections.connection = None
+            if attempt:
+                raise
+
+
+def pack_install(install_path: str, archive: str) -> list[str]:
+    """
+    Pack an install folder into a compressed archive for the binary cache, with the install folder replaced by a
+    placeholder in text files that refer to it. Returns the paths of those files, or None if the install has a
+    binary that refers to its install folder, which therefore can't be used anywhere else.
+    """
+    relocated = []
+    install_prefix = install_path.encode()
+    with tarfile.open(archive, 'w:gz', compresslevel=6) as tar:
+        for folder, dir_names, file_names in os.walk(install_path):
+            for name in sorted(dir_names + file_names):
+                item_path = os.path.join(folder, name)
+                rel_path = os.path.relpath(item_path, install_path)
+                if os.path.islink(item_path) or name in dir_names:
+                    tar.add(item_path, rel_path, recursive=False)
+                    continue
+
+                with open(item_path, 'rb') as f:
+                    contents = f.read()
+                if install_prefix in contents:
+                    if b'\0' in contents:
+                        return None
+                    contents = contents.replace(install_prefix, b'@GMAT_INSTALL_PREFIX@')
+                    relocated.append(rel_path)
+
+                info = tar.gettarinfo(item_path, rel_path)
+                info.size = len(contents)
+                tar.addfile(info, io.BytesIO(contents))
+
+    return relocated
+
+
+def unsafe_member(member: tarfile.TarInfo, dest: str) -> bool:
+    """
+    Check whether extracting an archive member into dest could write or link outside of it: a path or link target
+    that is absolute or leads out of dest with "..", or a member that isn't a file, folder or link.
+    """
+    dest = os.path.realpath(dest)
 
-            # Make sure wxWidgets was downloaded
-            if not os.path.exists(f'{wxwidgets_path}/wxWidgets-{version}'):
-                raise RuntimeError(f'Error in wxWidgets-{version} download.')
+    def outside(path: str) -> bool:
+        return os.path.isabs(path) or not os.path.normpath(os.path.join(dest, path)).startswith(f'{dest}{os.sep}')
 
-    def download_cspice(opts: dict):
-        # Download CSPICE if it doesn't already exist
-        cspice_path = opts['path']
-        version = versions['cspice']
-        direc = opts['dir']
+    if outside(member.name) or not (member.isfile() or member.isdir() or member.issym() or member.islnk()):
+        return True
+    if member.issym():
+        return outside(os.path.join(os.path.dirname(member.name), member.linkname))
+    if member.islnk():
+        return outside(member.linkname)
+    return False
 
-        if os.path.exists(cspice_path):
-            print('-- CSPICE already downloaded')
-            return
 
-        # Create & change directories
-        os.makedirs(cspice_path, exist_ok=True)
-        os.chdir(cspice_path)
+def fetch_cached_install(dependency: str, install_path: str, debug: bool, release: bool) -> bool:
+    """
+    Populate a dependency's install folder from the binary cache, if it has an install with the same build key.
+    The parts of the install are downloaded in parallel and checked against the hashes in its manifest.
+    Returns True if the install was populated.
+    """
+    if not options['binary_cache']:
+        return False
 
-        print(f'\nDownloading {cpu_bits}-bit CSPICE {version}...')
-        if windows:
-            # Download and extract Spice for Windows (32/64-bit)
-            if os.path.exists(f'{cspice_path}/{direc}'):
-                print('CSPICE already downloaded')
-                return
-            zip_name = f'{direc}.zip'
-            cspice_dl_com = (f'curl -L https://naif.jpl.nasa.gov/pub/naif/toolkit//C/PC_Windows_VisualC_'
-                             f'{cpu_bits}bit/packages/cspice.zip > {zip_name}')
-            os.system(cspice_dl_com)  # run command to download CSPICE
-            os.system(f'"{depends_dir}/bin/7za/7za.exe" x {zip_name} > nul')
-            # os.system(f'"{depends_dir}/bin/7za/7za.exe" x cspice.zip > cspice')  # TODO remove
-            # os.chdir(cspice_path)  # cspice_path: depends/cspice for now
-            os.rename('cspice', direc)
-            os.remove(zip_name)
+    key = build_key(dependency, debug, release)
+    try:
+        status, manifest_data = binary_cache_request('GET', f'/artifacts/{key}/manifest')
+    except (OSError, http.client.HTTPException) as error:
+        print(f'-- Binary cache {options["binary_cache"]} is unavailable ({error!r})')
+        return False
+    if status != 200:
+        return False
+
+    # The manifest comes from another machine, so check its shape before relying on it
+    try:
+        manifest = json.loads(manifest_data)
+        valid = (isinstance(manifest['size'], int) and isinstance(manifest['part_size'], int)
+                 and manifest['part_size'] > 0 and isinstance(manifest['parts'], list)
+                 and all(isinstance(part_hash, str) for part_hash in manifest['parts'])
+                 and isinstance(manifest['relocated'], list)
+                 and all(isinstance(rel_path, str) for rel_path in manifest['relocated']))
+    except (ValueError, KeyError, TypeError):
+        valid = False
+    if not valid:
+        print(f'-- The binary cache\'s manifest of {dependency} is corrupt')
+        return False
+    print(f'-- Downloading {dependency} from the binary cache ({manifest["size"] / 1e6:.1f} MB)...')
+    start = time.perf_counter()
+    os.makedirs(cache_path, exist_ok=True)
+    archive = f'{cache_path}/{dependency}-{key}.tar.gz'
+    write_lock = threading.Lock()
+
+    def fetch_part(part: int):
+        part_status, part_data = binary_cache_request('GET', f'/artifacts/{key}/parts/{part}')
+        if part_status != 200 or hashlib.sha256(part_data).hexdigest() != manifest['parts'][part]:
+            raise RuntimeError(f'Part {part} of {dependency} from the binary cache is missing or corrupt')
+        with write_lock:
+            f.seek(part * manifest['part_size'])
+            f.write(part_data)
 
-        else:  # Platform is not Windows
-            # Download and extract Spice for Mac/Linux (32/64-bit)
-            cspice_type = opts['type']
-            os.system(f'curl https://naif.jpl.nasa.gov/pub/naif/misc/toolkit_"{version}"/C/'
-                      f'{cspice_type}"_{cpu_bits}/packages/cspice.tar.Z > cspice.tar.Z')
-            os.system('gzip -d cspice.tar.Z')
-            os.system('tar -xf cspice.tar')
-            os.system(f'mv cspice {direc}')
-            os.remove('cspice.tar')
+    try:
+        with open(archive, 'wb') as f, concurrent.futures.ThreadPoolExecutor(binary_cache_jobs) as pool:
+            list(pool.map(fetch_part, range(len(manifest['parts']))))
+
+        remove_tree(install_path)
+        with tarfile.open(archive, 'r:gz') as tar:
+            # The archive comes from another machine, so nothing in it may reach outside the install folder
+            members = tar.getmembers()
+            unsafe = [member.name for member in members if unsafe_member(member, install_path)]
+            if unsafe:
+                raise RuntimeError(f'its archive has {len(unsafe)} unsafe members, e.g. {unsafe[0]}')
+            relocated = set(manifest['relocated'])
+            if not relocated <= {member.name for member in members if member.isfile()}:
+                raise RuntimeError('its manifest lists files that aren\'t in its archive')
+            os.makedirs(install_path, exist_ok=True)
+            if hasattr(tarfile, 'data_filter'):
+                tar.extractall(install_path, members, filter='data')
+            else:
+                tar.extractall(install_path, members)
+    except (RuntimeError, OSError, http.client.HTTPException, tarfile.TarError) as error:
+        print(f'-- Couldn\'t use {dependency} from the binary cache: {error}')
+        remove_tree(install_path)
+        return False
+    finally:
+        if os.path.exists(archive):
+            os.remove(archive)
+
+    for rel_path in manifest['relocated']:
+        with open(f'{install_path}/{rel_path}', 'rb') as f:
+            contents = f.read().replace(b'@GMAT_INSTALL_PREFIX@', install_path.encode())
+        with open(f'{install_path}/{rel_path}', 'wb') as f:
+            f.write(contents)
+
+    print(f'-- {dependency} installed from the binary cache in {time.perf_counter() - start:.1f} s')
+    return True
+
+
+def push_cached_install(dependency: str, install_path: str, debug: bool, release: bool):
+    """
+    Upload a finished install of a dependency to the binary cache, in parts uploaded in parallel. The manifest is
+    uploaded last, so the install is only found by others once it is complete.
+    """
+    if not options['binary_cache'] or not options['binary_cache_push']:
+        return
 
-    def download_swig(opts: dict):
-        # Download SWIG if it doesn't already exist
-        swig_direc = opts['dir']
-        swig_path = depends_paths['swig']
-        version = versions['swig']
+    key = build_key(dependency, debug, release)
+    try:
+        if binary_cache_request('HEAD', f'/artifacts/{key}/manifest')[0] == 200:
+            return  # another machine got there first
+    except (OSError, http.client.HTTPException) as error:
+        print(f'-- Binary cache {options["binary_cache"]} is unavailable ({error!r})')
+        return
 
-        # Check platform-appropriate path
-        if os.path.exists(swig_direc):
-            print('-- SWIG already downloaded')
+    os.makedirs(cache_path, exist_ok=True)
+    archive = f'{cache_path}/{dependency}-{key}.tar.gz'
+    try:
+        relocated = pack_install(install_path, archive)
+        if relocated is None:
+            print(f'-- {dependency} can only be used from {install_path}, so not uploading it to the binary cache')
             return
 
-        # Create & change directories
-        os.chdir(depends_dir)
-        os.makedirs(f'{depends_dir}/swig', exist_ok=True)
-        os.makedirs(swig_path, exist_ok=True)  # Duplication?
-        os.chdir(swig_path)
+        size = os.path.getsize(archive)
+        print(f'-- Uploading {dependency} to the binary cache ({size / 1e6:.1f} MB)...')
+
+        def push_part(part: int) -> str:
+            with open(archive, 'rb') as f:
+                f.seek(part * binary_cache_part_size)
+                part_data = f.read(binary_cache_part_size)
+            part_hash = hashlib.sha256(part_data).hexdigest()
+            part_status, _ = binary_cache_request('PUT', f'/artifacts/{key}/parts/{part}', part_data,
+                                                  {'X-Checksum-SHA256': part_hash})
+            if part_status not in (200, 201, 204):
+                raise RuntimeError(f'upload of part {part} failed with HTTP status {part_status}')
+            return part_hash
+
+        with concurrent.futures.ThreadPoolExecutor(binary_cache_jobs) as pool:
+            part_hashes = list(pool.map(push_part, range(max(-(-size // binary_cache_part_size), 1))))
+
+        manifest = json.dumps({'dependency': dependency, 'size': size, 'part_size': binary_cache_part_size,
+                               'parts': part_hashes, 'relocated': relocated}).encode()
+        binary_cache_request('PUT', f'/artifacts/{key}/manifest', manifest,
+                             {'X-Checksum-SHA256': hashlib.sha256(manifest).hexdigest()})
+    except (RuntimeError, OSError, http.client.HTTPException) as error:
+        print(f'-- Couldn\'t upload {dependency} to the binary cache: {error!r}')
+    finally:
+        if os.path.exists(archive):
+            os.remove(archive)
+
+
+def install_prebuilt(dependency: str, install_path: str, debug: bool, release: bool) -> bool:
+    """
+    Populate a dependency's install folder without building it, from the local store or failing that the binary
+    cache, if either has an install with the same build key. Returns True if the install was populated. Otherwise
+    the dependency is about to be built into the install folder, so any of its files shared with the store are
+    replaced by copies first.
+    """
+    if restore_install(dependency, install_path, debug, release):
+        record_install(dependency, install_path, debug, release)
+        return True
 
-        print(f'\nDownloading SWIG {version}...')
+    if fetch_cached_install(dependency, install_path, debug, release):
+        store_install(dependency, install_path, debug, release)
+        record_install(dependency, install_path, debug, release)
+        return True
 
-        if windows:
-            # Download and extract SWIG for Windows
-            os.system(f'curl -L http://download.sourceforge.net/swig/swigwin-{version}.zip > swig.zip')
-            os.system(f'"{depends_dir}/bin/7za/7za.exe" x swig.zip > nul')
-            os.rename(f'swigwin-{version}', 'swigwin')
-            os.remove('swig.zip')
-        else:
-            # Download and extract SWIG for Mac/Linux
-            os.system(f'curl -L http://download.sourceforge.net/swig/swig-{version}.tar.gz > swig.tar.gz')
-            os.system('gzip -d swig.tar.gz')
-            os.system('tar -xf swig.tar')
-            os.system(f'mv swig-{version} swig')
-            os.remove('swig.tar')
+    unshare_install(install_path)
+    return False
 
-            # [GMT-6892] Download PCRE into SWIG directory
-            pcre_version = versions['pcre']
-            pcre_name = opts['pcre_name']
-            print(f'\nDownloading PCRE {pcre_version} for use with SWIG...')
-            os.chdir(swig_direc)
-            os.system(f'curl -L https://sourceforge.net/projects/pcre/files/pcre/'
-                      f'{pcre_version}/{pcre_name}/download > {pcre_name}')
 
-    def download_java(opts: dict):
-        # Download Java if it doesn't already exist
-        java_path = f'{depends_paths["java"]}/{opts["plat"]}'
-        version = versions['java']
-        update = versions['java_update']
+def share_install(dependency: str, install_path: str, debug: bool, release: bool):
+    """
+    Make a newly built install of a dependency available to other checkouts through the local store, and to other
+    machines through the binary cache, and add it to the inventory.
+    """
+    push_cached_install(dependency, install_path, debug, release)
+    store_install(dependency, install_path, debug, release)
+    record_install(dependency, install_path, debug, release)
 
-        if os.path.exists(java_path):
-            print('-- Java already downloaded')
-            return
 
-        # Create & change directories
-        os.makedirs(java_path, exist_ok=True)
-        os.chdir(java_path)
+def version_parts(version: str) -> list[int]:
+    """
+    Split a version like 3.2.2 or 11.0.5+10 into its numeric parts, e.g. [3, 2, 2] or [11, 0, 5, 10].
+    """
+    return [int(part) for part in re.findall(r'\d+', version)]
 
-        java_major_version = version.split('.')[0]
-        java_full_version = f'{version}+{update}'
 
-        java_base_url = (f'https://github.com/AdoptOpenJDK/openjdk{java_major_version}'
-                         f'-binaries/releases/download/jdk-{java_full_version}/')
-        java_url = (f'{java_base_url}OpenJDK{java_major_version}U-jdk_x64_{opts["plat"]}'
-                    f'_hotspot_{version}_{update}')
+def probe_system(dependency: str) -> dict:
+    """
+    Look for a system-installed copy of a dependency that is compatible with the version in versions, returning its
+    version and install prefix, or None if there isn't one.
+    """
+    command, version_pattern, matching_parts = system_probes[dependency]
+    java_home = os.getenv('JAVA_HOME', '')
+    if dependency == 'java' and not java_home:
+        javac = shutil.which('javac')
+        if not javac:
+            return None
+        java_home = os.path.dirname(os.path.dirname(os.path.realpath(javac)))
+
+    command = [arg.format(java_home=java_home) for arg in command]
+    try:
+        result = subprocess.run(command, capture_output=True, text=True, timeout=30)
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    match = re.search(version_pattern, result.stdout + result.stderr, re.M)  # java -version prints to stderr
+    if result.returncode != 0 or not match:
+        return None
+
+    found, wanted = version_parts(match.group(1)), version_parts(versions[dependency])
+    if found[:matching_parts] != wanted[:matching_parts] or found < wanted[:len(found)]:
+        print(f'-- System {dependency} {match.group(1)} is not compatible with {versions[dependency]}')
+        return None
+
+    if dependency == 'xerces':
+        prefix = subprocess.run(['pkg-config', '--variable=prefix', 'xerces-c'], capture_output=True, text=True)
+        prefix = prefix.stdout.strip()
+    elif dependency == 'wxWidgets':
+        # GMAT needs particular wxWidgets libraries, which wx-config fails on if any is missing
+        libs = subprocess.run(['wx-config', f'--libs={",".join(wx_gmat_libs)}'], capture_output=True, text=True)
+        if libs.returncode != 0:
+            print(f'-- System wxWidgets {match.group(1)} is missing libraries GMAT needs: {libs.stderr.strip()}')
+            return None
+        prefix = subprocess.run(['wx-config', '--prefix'], capture_output=True, text=True).stdout.strip()
+    elif dependency == 'swig':
+        prefix = os.path.dirname(os.path.dirname(os.path.realpath(shutil.which('swig'))))
+    else:
+        prefix = java_home
+
+    return {'version': match.group(1), 'prefix': prefix} if prefix else None
 
-        print(f'\nDownloading Java JDK {java_full_version}...')
-        if windows:
-            # Download and extract AdoptOpenJDK for Windows
-            os.system(f'curl -L {java_url}.zip > jdk.zip')
-            os.system(f'"{depends_dir}/bin/7za/7za.exe" x jdk.zip > nul')
-            os.rename(f'jdk-{java_full_version}', 'jdk')
-            os.remove('jdk.zip')
-        else:
-            # Download and extract AdoptOpenJDK for Mac/Linux
-            os.system(f'curl -L {java_url}.tar.gz > jdk.tar.gz')
-            os.system('gzip -d jdk.tar.gz')
-            os.system('tar -xf jdk.tar')
-            os.system(f'mv jdk-{java_full_version} jdk')
-            os.remove('jdk.tar')
 
-    print('\n*** Downloading GMAT dependencies ***')
+def find_system_installs():
+    """
+    Probe the system for compatible installs of the dependencies in the use_system option, all at once, and
+    record those found in system_installs. Not done on Windows, whose builds don't use system installs (the
+    dependencies there are pre-built or built with their own Visual Studio solutions, and linking a system Java in
+    needs symlink rights).
+    """
+    if windows:
+        if options['use_system']:
+            print('-- The use_system option is ignored on Windows')
+        return
 
-    download_xerces()
-    download_wxwidgets()
-    download_cspice(params['cspice_opts'])
-    download_swig(params['swig_opts'])
-    download_java(params['java_opts'])
+    wanted = list(system_probes) if options['use_system'] == 'all' else \
+        [dependency for dependency in options['use_system'].split(',') if dependency]
+    unknown = set(wanted) - set(system_probes)
+    if unknown:
+        raise ValueError(f'Unrecognised use_system dependencies: {", ".join(sorted(unknown))}. '
+                         f'Allowed: {", ".join(system_probes)}')
 
-    print("\nDependencies download complete")
+    with concurrent.futures.ThreadPoolExecutor(len(wanted) or 1) as pool:
+        for dependency, found in zip(wanted, pool.map(probe_system, wanted)):
+            if found:
+                print(f'-- Found compatible system {dependency} {found["version"]} in {found["prefix"]}')
+                system_installs[dependency] = found
 
 
-def make_depend(dependency: str, install_type: str):
-    dep_l = dependency.lower()  # convert name to lowercase
-    install = 'install ' if install_type == 'install' else ''
-    j_cores = f' -j{cores}' if 'build' in install_type else ''
-    make_flag = os.system(f'make {install}{j_cores}> "{logs_path}/{dep_l}_{install_type}.log" 2>&1')
-    if make_flag != 0:
-        raise RuntimeError(f'{dependency} {install_type} build failed. Fix errors and try again.')
+def use_system_install(dependency: str, install_path: str) -> bool:
+    """
+    Link a dependency's install folder to the compatible system install, if one was found, so it is used instead
+    of building the dependency, and add it to the inventory. Returns True if it was. A link left by an earlier run
+    is removed when the system install isn't used, so that a build doesn't install into the system.
+    """
+    if dependency not in system_installs:
+        if os.path.islink(install_path):
+            os.remove(install_path)
+        return False
+
+    prefix = system_installs[dependency]['prefix']
+    if not (os.path.islink(install_path) and os.readlink(install_path) == prefix):
+        remove_tree(install_path)
+        os.makedirs(os.path.dirname(install_path), exist_ok=True)
+        os.symlink(prefix, install_path, target_is_directory=True)
+    print(f'-- Using the system {dependency} {system_installs[dependency]["version"]} from {prefix}')
+
+    save_install_record(dependency, {
+        'version': system_installs[dependency]['version'], 'configuration': 'system',
+        'platform': f'{plat} {cpu_bits}-bit', 'profile': 'system', 'build_key': '', 'install_path': install_path,
+        'files': 0, 'size': 0, 'date': time.strftime('%Y-%m-%d %H:%M:%S'), 'hashes': {}, 'system': prefix,
+    })
+    return True
 
 
 def build_xerces(debug: bool, release: bool, ):
     xerces_path = depends_paths['xerces']
     version = versions['xerces']
 
-    if not os.path.exists(xerces_path):
+    if not os.path.exists(xerces_path) and 'xerces' not in system_installs:
         raise FileNotFoundError(f'Xerces build cannot begin because the xerces folder was not found.'
                                 f'\nCurrent working directory: {os.getcwd()}')
 
@@ -337,12 +2907,15 @@ def build_xerces(debug: bool, release: bool, ):
         # xerces_arch = 'Win64'
 
         # Build Xerces if the directory doesn't already exist
-        if os.path.exists(xerces_outdir):
+        xerces_build_path = f'{xerces_path}/build/windows'
+        if os.path.exists(xerces_outdir) and profile_matches('Xerces', xerces_outdir, (xerces_build_path,)):
             print('-- Xerces already configured')
             return
+        if install_prebuilt('xerces', xerces_outdir, debug, release):
+            return
 
-        os.makedirs(f'{xerces_path}/build/windows', exist_ok=True)
-        os.chdir(f'{xerces_path}/build/windows')
+        os.makedirs(xerces_build_path, exist_ok=True)
+        os.chdir(xerces_build_path)
         print('-- Setting up Xerces build')
         vs_maj_ver = versions['vs_major']
         vs_ver = versions['vs']
@@ -353,76 +2926,146 @@ def build_xerces(debug: bool, release: bool, ):
         #           '" -DBUILD_SHARED_LIBS:BOOL=OFF -Dtranscoder=windows -DCMAKE_INSTALL_PREFIX="' + xerces_outdir +
         #           '" "' + xerces_path + '"  > ' + logs_path + '\\xerces_cmake.log 2>&1')
 
+        release_flags, release_link_flags = profile_flags()
         os.system(
             f'cmake -G "Visual Studio {vs_maj_ver} {vs_ver}" -DBUILD_SHARED_LIBS:BOOL=OFF -Dtranscoder=windows '
+            f'-DCMAKE_C_FLAGS_RELEASE="/MD {release_flags} /Ob2 /DNDEBUG" '
+            f'-DCMAKE_CXX_FLAGS_RELEASE="/MD {release_flags} /Ob2 /DNDEBUG" '
+            f'-DCMAKE_STATIC_LINKER_FLAGS_RELEASE="{release_link_flags}" {xerces_cmake_pch(xerces_build_path)} '
             f'-DCMAKE_INSTALL_PREFIX="{xerces_outdir}" "{xerces_path}" > "{logs_path}/xerces_cmake.log" 2>&1')
 
         if debug:
             print('-- Compiling debug Xerces. This could take a while...')
-            os.system(f'cmake --build . --config Debug --target install > "{logs_path}/xerces_build_debug.log" 2>&1')
+            run_timed('xerces', 'build_debug', f'cmake --build . --config Debug --target install > '
+                                               f'"{logs_path}/xerces_build_debug.log" 2>&1',
+                      f'{logs_path}/xerces_build_debug.log')
 
         if release:
             print('-- Compiling release Xerces. This could take a while...')
-            os.system(f'cmake --build . --config Release --target install > '
-                      f'"{logs_path}/xerces_build_release.log" 2>&1')
+            run_timed('xerces', 'build_release', f'cmake --build . --config Release --target install > '
+                                                 f'"{logs_path}/xerces_build_release.log" 2>&1',
+                      f'{logs_path}/xerces_build_release.log')
 
+        check_pch('Xerces', glob.glob(f'{xerces_build_path}/**/*.pch', recursive=True))
+
+        write_profile_stamp(xerces_outdir)
+        share_install('xerces', xerces_outdir, debug, release)
         return
 
     # Out-of-source xerces build/install locations
     elif macos:
-        xerces_build_path = f'{xerces_path}/cocoa-build'
+        xerces_build_path = build_location('xerces', f'{xerces_path}/cocoa-build')
         xerces_install_path = f'{xerces_path}/cocoa-install'
     else:
-        xerces_build_path = f'{xerces_path}/linux-build'
+        xerces_build_path = build_location('xerces', f'{xerces_path}/linux-build')
         xerces_install_path = f'{xerces_path}/linux-install'
 
+    if use_system_install('xerces', xerces_install_path):
+        return
+
     # Find a test file to check if xerces has already been installed
     xerces_test_file = f'{xerces_install_path}/lib/libxerces-c.a'
 
     # Build xerces if the test file doesn't already exist
-    if os.path.exists(xerces_test_file):
+    if os.path.exists(xerces_test_file) and profile_matches('Xerces', xerces_install_path, (xerces_build_path,),
+                                                            uses_pgo('xerces', release)):
         print(f'Xerces {version} already configured')
         return
+    if install_prebuilt('xerces', xerces_install_path, debug, release):
+        return
 
-    os.mkdir(xerces_build_path)
+    os.makedirs(xerces_build_path, exist_ok=True)
     os.chdir(xerces_build_path)
 
     # For users who compile GMAT on multiple platforms side-by-side.
     # Running Windows configure.bat causes Mac/Linux configure scripts
     # to have missing permissions.
-    os.system('chmod u+x ../configure')
-    os.system('chmod u+x ../config/*')
+    os.system(f'chmod u+x "{xerces_path}/configure"')
+    os.system(f'chmod u+x "{xerces_path}"/config/*')
 
     # Xerces needs flags on OSX
-    macos_flags = '' if sys.platform != 'darwin' else f'-mmacosx-version-min={osx_min_version} --sysroot={osx_sdk}'
+    macos_flags = '' if sys.platform != 'darwin' else (f'-mmacosx-version-min={osx_min_version} '
+                                                       f'--sysroot={macos_sdk()}')
 
     common_xerces_flags = ('--disable-shared --disable-netaccessor-curl'
-                           ' --disable-transcoder-icu --disable-msgloader-icu')
+                           f' --disable-transcoder-icu --disable-msgloader-icu {profiled_compilers("xerces")}')
 
     if debug:
         print(f'Configuring Xerces {version} debug library. This could take a while...')
         common_c_flags = f'-O0 -g -fPIC {macos_flags}'
-        os.system(f'../configure {common_xerces_flags} CFLAGS="{common_c_flags}" CXXFLAGS={common_c_flags}" '
-                  f'--prefix="{xerces_install_path}" > {logs_path}/xerces_configure_debug.log" 2>&1')
+        run_configure(f'"{xerces_path}/configure"', f'{common_xerces_flags} CFLAGS="{common_c_flags}" '
+                      f'CXXFLAGS="{common_c_flags}" LDFLAGS="{linker_flags()}" --prefix="{xerces_install_path}"',
+                      'xerces_configure_debug', f'{common_c_flags} {linker_flags()}')
 
-        make_depend('xerces', 'build_debug')
+        make_depend('xerces', 'build_debug', xerces_pch(xerces_build_path, xerces_path, common_c_flags))
+        check_pch('Xerces', glob.glob(f'{xerces_build_path}/pch/*.[gp]ch'), f'{logs_path}/xerces_build_debug.log')
         make_depend('xerces', 'install_debug')
 
         os.rename(f'{xerces_install_path}/lib/libxerces-c.a',
                   f'{xerces_install_path}/lib/libxerces-cd.a')
         os.system('make clean > /dev/null 2>&1')
 
+    def build_release(extra_flags: str = ''):
+        release_flags, release_link_flags = profile_flags()
+        common_c_flags = f'{release_flags} {extra_flags} -fPIC {macos_flags}'
+        run_configure(f'"{xerces_path}/configure"', f'{common_xerces_flags} CFLAGS="{common_c_flags}" '
+                      f'CXXFLAGS="{common_c_flags}" LDFLAGS="{release_link_flags} {extra_flags} {linker_flags()}" '
+                      f'--prefix="{xerces_install_path}"', 'xerces_configure_release',
+                      f'{common_c_flags} {release_link_flags} {extra_flags} {linker_flags()}')
+
+        os.system('make clean > /dev/null 2>&1')
+        make_depend('xerces', 'build_release', xerces_pch(xerces_build_path, xerces_path, common_c_flags))
+        check_pch('Xerces', glob.glob(f'{xerces_build_path}/pch/*.[gp]ch'), f'{logs_path}/xerces_build_release.log')
+        make_depend('xerces', 'install_release')
+
     if release:
         print(f'Configuring Xerces {version} release library. This could take a while...')
-        common_c_flags = f'-O2 -fPIC {macos_flags}'
-        os.system(f'../configure {common_xerces_flags} CFLAGS="{common_c_flags}" CXXFLAGS="{common_c_flags}" '
-                  f'--prefix="{xerces_install_path}" > "{logs_path}/xerces_configure_release.log" 2>&1')
+        build_release()
+
+        if options['pgo']:
+            xerces_libs = '-lpthread' if not macos else '-framework CoreServices'
+            pgo_build('xerces', build_release, 'xerces_train.cpp',
+                      f'-I"{xerces_install_path}/include" "{xerces_install_path}/lib/libxerces-c.a" {xerces_libs}')
+
+    compile_time_report('xerces')
+    write_profile_stamp(xerces_install_path, uses_pgo('xerces', release))
+    share_install('xerces', xerces_install_path, debug, release)
+    os.chdir(xerces_path)
+    remove_build_dir(xerces_build_path)
+
+
+def wx_profile_flags(windows_build: bool = False) -> str:
+    """
+    Get the configure switches (or nmake settings for a Windows build) that leave out the wxWidgets libraries
+    that GMAT doesn't use, according to the wx_profile option.
+    """
+    profile = options['wx_profile']
+    if profile == 'full':
+        return ''
+    elif profile != 'gmat':
+        raise ValueError(f'wx_profile "{profile}" not recognised - use "full" or "gmat"')
+
+    unused_libs = [lib for lib in wx_optional_libs if lib not in wx_gmat_libs]
+    print(f'-- Leaving out wxWidgets libraries not used by GMAT: {", ".join(unused_libs)}')
+    return ' '.join(wx_optional_libs[lib][1 if windows_build else 0] for lib in unused_libs)
 
-        make_depend('xerces', 'build_release')
-        make_depend('xerces', 'install_release')
 
-    os.chdir('..')
-    os.system(f'rm -Rf {xerces_build_path}')
+def check_wx_libs(lib_path: str, ext: str):
+    """
+    Check that every wxWidgets library GMAT needs was built, whichever wx_profile was used.
+    """
+    series = '.'.join(versions['wxWidgets'].split('.')[:2])  # e.g. 3.0
+    missing = []
+    for lib in wx_gmat_libs:
+        # The base library is libwx_baseu-3.0, the others e.g. libwx_baseu_net-3.0 or libwx_gtk2u_core-3.0
+        lib_pattern = f'libwx_baseu-{series}.{ext}' if lib == 'base' else f'libwx_*u_{lib}-{series}.{ext}'
+        if not fnmatch.filter(os.listdir(lib_path), lib_pattern):
+            missing.append(lib)
+
+    if missing:
+        raise RuntimeError(f'wxWidgets build is missing libraries needed by GMAT: {", ".join(missing)}. '
+                           f'Check {logs_path}/wxWidgets_configure.log')
+    print(f'-- Found all wxWidgets libraries needed by GMAT ({", ".join(wx_gmat_libs)})')
 
 
 def build_wxWidgets(debug: bool, release: bool, opts: dict[str, str]):
@@ -440,7 +3083,10 @@ def build_wxWidgets(debug: bool, release: bool, opts: dict[str, str]):
         os.chdir(depends_dir)  # switch back to depends so later relative directory changes work
 
         # Download wxWidgets files if they don't already exist
-        if os.path.exists(f'{wx_path}/lib/vc{wx_type}dll'):
+        # nmake puts the object files of each build in a folder such as build/msw/vc140_mswudll_x64
+        wx_object_paths = tuple(path for path in glob.glob(f'{wx_path}/build/msw/vc*') if os.path.isdir(path))
+        if (os.path.exists(f'{wx_path}/lib/vc{wx_type}dll')
+                and profile_matches('wxWidgets', f'{wx_path}/lib/vc{wx_type}dll', wx_object_paths)):
             print('-- wxWidgets already configured')
             return
 
@@ -456,23 +3102,34 @@ def build_wxWidgets(debug: bool, release: bool, opts: dict[str, str]):
         vc_major_version = versions['vc_major']
         vc_minor_version = versions['vc_minor']
 
+        wx_flags = wx_profile_flags(windows_build=True)
+
+        release_flags, release_link_flags = profile_flags()
+
         def wxwidgets_build_command(build_type):
+            build_flags = '' if build_type == 'debug' else \
+                f'CFLAGS="{release_flags}" CXXFLAGS="{release_flags}" LDFLAGS="{release_link_flags}"'
             return (f'nmake -f makefile.vc OFFICIAL_BUILD=1 COMPILER_VERSION='
-                    f'{vc_major_version}{vc_minor_version} {target_cpu} SHARED=1 BUILD={build_type}'
-                    f' > "{logs_path}/wxWidgets_build_{build_type}.log" 2>&1')
+                    f'{vc_major_version}{vc_minor_version} {target_cpu} SHARED=1 BUILD={build_type} {wx_flags} '
+                    f'{build_flags} > "{logs_path}/wxWidgets_build_{build_type}.log" 2>&1')
 
+        # makefile.vc always uses precompiled headers, so the pch option makes no difference here
         if debug:
             print('-- Compiling debug wxWidgets. This could take a while...')
-            os.system(wxwidgets_build_command('debug'))
+            run_timed('wxwidgets', 'build_debug', wxwidgets_build_command('debug'),
+                      f'{logs_path}/wxWidgets_build_debug.log')
 
         if release:
             print('-- Compiling release wxWidgets. This could take a while...')
-            os.system(wxwidgets_build_command('release'))
+            run_timed('wxwidgets', 'build_release', wxwidgets_build_command('release'),
+                      f'{logs_path}/wxWidgets_build_release.log')
 
         os.chdir('../..')
 
         os.chdir('lib')
         os.rename(f'vc{vc_major_version}{vc_minor_version}{wx_type}dll', f'vc{wx_type}dll')  # rename folder
+        write_profile_stamp(f'vc{wx_type}dll')
+        record_install('wxWidgets', os.path.abspath(f'vc{wx_type}dll'), debug, release)
 
         os.chdir(depends_dir)
 
@@ -489,10 +3146,14 @@ def build_wxWidgets(debug: bool, release: bool, opts: dict[str, str]):
         # Set build path based on version
         wx_path = f'{wxwidgets_path}/wxWidgets-{version}'
 
-        wx_build_path = f'{wx_path}/{plat}-build'
+        wx_build_path = build_location('wxWidgets', f'{wx_path}/{plat}-build')
         wx_install_path = f'{wx_path}/{plat}-install'
         ext = opts['ext']
-        wx_test_file = f'{wx_install_path}/lib/libwx_baseu-3.0.{ext}'
+        wx_series = '.'.join(version.split('.')[:2])
+        wx_test_file = f'{wx_install_path}/lib/libwx_baseu-{wx_series}.{ext}'
+
+        if use_system_install('wxWidgets', wx_install_path):
+            return
 
         # Build wxWidgets if the test file doesn't already exist
         # Note that according to
@@ -502,9 +3163,12 @@ def build_wxWidgets(debug: bool, release: bool, opts: dict[str, str]):
         # IF a debug version is required in the future, then this
         # if/else block should be repeated with the --enable-debug flag
         # added to mac & linux versions of the wx ./configure command
-        if os.path.exists(wx_test_file):
+        if os.path.exists(wx_test_file) and profile_matches('wxWidgets', wx_install_path, (wx_build_path,)):
             print(f'wxWidgets {version} already configured')
             return
+        # wxWidgets always builds a single release-style library set here (see above)
+        if install_prebuilt('wxWidgets', wx_install_path, False, True):
+            return
 
         os.makedirs(wx_build_path, exist_ok=True)
         os.chdir(wx_build_path)
@@ -516,7 +3180,7 @@ def build_wxWidgets(debug: bool, release: bool, opts: dict[str, str]):
             # wxWidgets 3.0.2 has a compile error due to an incorrect
             # include file on OSX 10.10+. Apply patch to fix this.
             # See [GMT-5384] and http://goharsha.com/blog/compiling-wxwidgets-3-0-2-mac-os-x-yosemite/
-            osx_ver = mac_plat.mac_ver()[0]
+            osx_ver = toolchain_info()['macos_version']
             if version == '3.0.2' and osx_ver > '10.10.0':
                 os.system(f'sed -i.bk "s/WebKit.h/WebKitLegacy.h/" "{wx_path}/src/osx/webview_webkit.mm"')
 
@@ -524,16 +3188,196 @@ def build_wxWidgets(debug: bool, release: bool, opts: dict[str, str]):
             # NOTE on liblzma: The Mac build/test machine contains liblzma (via homebrew 'xz'), which conflicts with
             #  the wxWidgets build process
             macos_flags = (f'--with-osx_cocoa --without-liblzma --with-macosx-version-min={osx_min_version} '
-                           f'--with-macosx-sdk={osx_sdk}')
+                           f'--with-macosx-sdk={macos_sdk()}')
 
-        os.system(f'../configure {macos_flags} --enable-unicode --with-opengl --prefix="{wx_install_path}" '
-                  f'> "{logs_path}/wxWidgets_configure.log" 2>&1')
+        opengl_flag = '--with-opengl' if 'gl' in wx_gmat_libs else ''
+        # Without the pch option, wxWidgets' configure keeps its own default (precompiled headers with GCC/Clang)
+        pch_flag = '--enable-precomp-headers' if options['pch'] else ''
+        run_configure(f'"{wx_path}/configure"', f'{macos_flags} --enable-unicode {opengl_flag} {pch_flag} '
+                      f'{wx_profile_flags()} {profile_configure_flags()} {profiled_compilers("wxwidgets")} '
+                      f'--prefix="{wx_install_path}"',
+                      'wxWidgets_configure', f'{macos_flags} {profile_configure_flags()}')
 
         # Compile, install, and clean wxWidgets
         make_depend('wxWidgets', 'build')
+        check_pch('wxWidgets', glob.glob(f'{wx_build_path}/.pch/**/*.[gp]ch', recursive=True),
+                  f'{logs_path}/wxwidgets_build.log')
         make_depend('wxWidgets', 'install')
-        os.chdir('..')
-        os.system(f'rm -Rf "{wx_build_path}"')
+        compile_time_report('wxwidgets')
+        check_wx_libs(f'{wx_install_path}/lib', ext)
+        write_profile_stamp(wx_install_path)
+        share_install('wxWidgets', wx_install_path, False, True)
+        os.chdir(wx_path)
+        remove_build_dir(wx_build_path)
+
+
+def static_names(source_text: str) -> set[str]:
+    """
+    Find the names of the file-scope static variables and functions defined in a C source file.
+    """
+    names = set()
+    for declaration in re.findall(r'^static\s+([^;\n]*)', source_text, re.M):
+        declaration = re.sub(r'"(?:\\.|[^"\\])*"', '""', declaration)  # blank out strings, which may hold commas
+        declaration = re.sub(r'\{[^{}]*\}', '', declaration).split('{')[0]  # and initialisers and function bodies
+
+        if '(' in declaration:
+            # A function, e.g. "static int zzfunc(integer *n)"
+            function = re.search(r'(\w+)\s*\($', declaration.split('(')[0] + '(')
+            if function is not None and len(re.findall(r'\w+', declaration.split('(')[0])) >= 2:
+                names.add(function.group(1))
+            continue
+
+        # Variables, e.g. "static integer c__1 = 1" or "static logical first, done"
+        for i, declarator in enumerate(declaration.split(',')):
+            identifiers = re.findall(r'[A-Za-z_]\w*', re.sub(r'\[.*?\]', '', declarator.split('=')[0]))
+            # The first declarator also holds the type, so needs at least two identifiers
+            if len(identifiers) >= (2 if i == 0 else 1):
+                names.add(identifiers[-1])
+
+    return names
+
+
+def write_unity_file(unity_file: str, members: list[tuple[str, set[str], set[str]]]):
+    """
+    Write a unity source that #includes each member source, given as (path, static names, macro names). Each
+    member's statics are renamed with a macro so they can't clash with another member's, and its macros are
+    undefined afterwards so they can't leak into the next member.
+    """
+    lines = ['/* Unity build source generated by config-cmdline.py */']
+    for i, (source, statics, macros) in enumerate(members):
+        lines += [f'#define {name} {name}_u{i}' for name in sorted(statics)]
+        lines.append(f'#include "{source}"')
+        lines += [f'#undef {name}' for name in sorted(statics | macros)]
+
+    with open(unity_file, 'w') as f:
+        f.write('\n'.join(lines) + '\n')
+
+
+def write_cspice_unity_sources(src_dir: str, unity_dir: str, batches: int) -> list[str]:
+    """
+    Write the unity sources for a CSPICE unity build, dividing the CSPICE sources between the given number of
+    batches of roughly equal size. Sources that can't safely share a translation unit get a unity source of their
+    own. Returns the paths of all the unity sources.
+    """
+    shutil.rmtree(unity_dir, ignore_errors=True)
+    os.makedirs(unity_dir)
+
+    unity_sources = []
+    batchable = []
+    for source in sorted(glob.glob(f'{src_dir}/*.c')):
+        with open(source, 'r', errors='replace') as f:
+            source_text = f.read()
+
+        name = os.path.basename(source)
+        if name in cspice_unity_exclude or re.search(r'^(?:static\s+)?(?:typedef|struct|union|enum)\b', source_text,
+                                                      re.M):
+            unity_sources.append(f'{unity_dir}/solo_{name}')
+            write_unity_file(unity_sources[-1], [(source, set(), set())])
+            continue
+
+        macros = set(re.findall(r'^\s*#\s*define\s+(\w+)', source_text, re.M))
+        batchable.append((len(source_text), (source, static_names(source_text) - macros, macros)))
+
+    # Largest sources first, each into the batch with the least code so far
+    batch_members: list[list] = [[] for _ in range(min(batches, len(batchable)))]
+    batch_sizes = [0] * len(batch_members)
+    for size, member in sorted(batchable, key=lambda item: item[0], reverse=True):
+        smallest = batch_sizes.index(min(batch_sizes))
+        batch_members[smallest].append(member)
+        batch_sizes[smallest] += size
+
+    for i, members in enumerate(batch_members):
+        unity_sources.append(f'{unity_dir}/unity_{i:03d}.c')
+        write_unity_file(unity_sources[-1], sorted(members))
+
+    return unity_sources
+
+
+def compile_cspice_unity(src_dir: str, compile_options: str, lib_file: str, log_file: str) -> int:
+    """
+    Build a CSPICE library as a unity build, compiling the batched sources in parallel, then archiving them.
+    A batch that fails to compile is compiled file by file instead. Returns 0 on success.
+    """
+    unity_dir = f'{src_dir}_unity'
+    unity_sources = write_cspice_unity_sources(src_dir, unity_dir, options['cspice_unity'])
+    compiler = os.getenv('TKCOMPILER', 'cc')
+
+    def compile_source(source: str) -> tuple[str, int, str]:
+        result = subprocess.run(f'{compiler} {compile_options} -I"{src_dir}" "{source}" -o "{source[:-2]}.o"',
+                                shell=True, capture_output=True, text=True)
+        return source, result.returncode, result.stdout + result.stderr
+
+    with open(log_file, 'w') as log, concurrent.futures.ThreadPoolExecutor(os.cpu_count() or 1) as pool:
+        log.write(f'Compiling {len(unity_sources)} unity sources in {unity_dir}\n')
+        failed = []
+        for source, compile_flag, output in pool.map(compile_source, unity_sources):
+            log.write(output)
+            if compile_flag != 0:
+                failed.append(source)
+
+        solo_sources = []
+        for unity_source in failed:
+            log.write(f'{unity_source} failed to compile, so compiling its sources one by one\n')
+            with open(unity_source, 'r') as f:
+                members = re.findall(r'^#include "(.*)"$', f.read(), re.M)
+            os.remove(unity_source)
+            for member in members:
+                solo_sources.append(f'{unity_dir}/solo_{os.path.basename(member)}')
+                write_unity_file(solo_sources[-1], [(member, set(), set())])
+
+        for source, compile_flag, output in pool.map(compile_source, solo_sources):
+            log.write(output)
+            if compile_flag != 0:
+                return compile_flag
+
+    if os.path.exists(lib_file):
+        os.remove(lib_file)
+    return os.system(f'ar crs "{lib_file}" "{unity_dir}"/*.o >> "{log_file}" 2>&1')
+
+
+def library_symbols(lib_file: str) -> set[str]:
+    """
+    Get the names of the public symbols defined in a static library, leaving out those added by LTO and PGO.
+    """
+    result = subprocess.run(['nm', '-g', '-P', lib_file], capture_output=True, text=True)
+    symbols = set()
+    for line in result.stdout.splitlines():
+        fields = line.split()
+        if len(fields) >= 2 and fields[1].isupper() and fields[1] != 'U' and \
+                not fields[0].startswith(('__gnu_lto', '__gcov', '__llvm_prf', '__llvm_profile')):
+            symbols.add(fields[0])
+    return symbols
+
+
+def save_library_symbols(lib_file: str, symbols_file: str):
+    """
+    Save the public symbols of a library built the normal way, for unity builds to be checked against.
+    """
+    os.makedirs(os.path.dirname(symbols_file), exist_ok=True)
+    with open(symbols_file, 'w') as f:
+        f.write('\n'.join(sorted(library_symbols(lib_file))) + '\n')
+
+
+def check_library_symbols(lib_file: str, symbols_file: str):
+    """
+    Check that a unity-built library exports exactly the same public symbols as a normal build of it.
+    """
+    lib_name = os.path.basename(lib_file)
+    if not os.path.exists(symbols_file):
+        print(f'-- No symbols from a normal CSPICE build to check {lib_name} against')
+        return
+
+    with open(symbols_file, 'r') as f:
+        expected = set(f.read().split())
+    found = library_symbols(lib_file)
+
+    missing = sorted(expected - found)
+    unexpected = sorted(found - expected)
+    if missing or unexpected:
+        raise RuntimeError(f'Unity build of {lib_name} exports different symbols to a normal build. '
+                           f'Missing: {", ".join(missing[:10]) or "none"}. '
+                           f'Unexpected: {", ".join(unexpected[:10]) or "none"}.')
+    print(f'-- {lib_name} exports the same {len(found)} public symbols as a normal build')
 
 
 def build_cspice(debug: bool, release: bool, opts: dict):
@@ -579,19 +3423,26 @@ def build_cspice(debug: bool, release: bool, opts: dict):
 
             if build_type == 'debug':
                 build_flag = '/DEBUG /Z7'
+                link_flag = ''
                 lib_flag = 'd'
             elif build_type == 'release':
-                build_flag = '/O2'
+                build_flag, link_flag = profile_flags()
                 lib_flag = ''
             else:
                 raise SyntaxError(f'build_type "{build_type}" not recognized')
 
-            os.chdir(f'{path}/{direc}/src/cspice')
+            if options['cspice_unity']:
+                # The unity folder sits beside src/cspice, so ../../lib is the same folder from either
+                write_cspice_unity_sources(f'{path}/{direc}/src/cspice', f'{path}/{direc}/src/cspice_unity',
+                                           options['cspice_unity'])
+                os.chdir(f'{path}/{direc}/src/cspice_unity')
+            else:
+                os.chdir(f'{path}/{direc}/src/cspice')
             print(f'-- Compiling {build_type} CSPICE. This could take a while...')
             os.system(f'cl /c {build_flag} /MP -D_COMPLEX_DEFINED -DMSDOS'
                       f' -DOMIT_BLANK_CC -DNON_ANSI_STDIO -DUIOLEN_int *.c >'
                       f' "{logs_path}/cspice_build_{build_type}.log" 2>&1')
-            os.system(f'link -lib /out:../../lib/cspice{lib_flag}.lib *.obj >> '
+            os.system(f'link -lib {link_flag} /out:../../lib/cspice{lib_flag}.lib *.obj >> '
                       f'"{logs_path}/cspice_build_{build_type}.log" 2>&1')
 
             os.system('del *.obj')
@@ -600,6 +3451,8 @@ def build_cspice(debug: bool, release: bool, opts: dict):
             compile_cspice('debug')
         if release:
             compile_cspice('release')
+            write_profile_stamp(f'{path}/{direc}/lib')
+        record_install('cspice', f'{path}/{direc}/lib', debug, release)
 
         os.chdir(depends_dir)
         return
@@ -611,36 +3464,89 @@ def build_cspice(debug: bool, release: bool, opts: dict):
         os.system(f'export TKCOMPILEARCH="{tk_compile_arch}"')
 
         flags = '' if sys.platform != 'darwin' else (f'-mmacosx-version-min={osx_min_version} '
-                                                     f'-Wno-error=implicit-function-declaration --sysroot={osx_sdk}')
+                                                     f'-Wno-error=implicit-function-declaration '
+                                                     f'--sysroot={macos_sdk()}')
 
-        cspice_test_file = f'{spice_path}/lib/cspiced.a'
+        cspice_lib_path = f'{spice_path}/lib'
+        cspice_test_file = f'{cspice_lib_path}/cspiced.a'
 
-        if os.path.exists(cspice_test_file):
+        if os.path.exists(cspice_test_file) and profile_matches('CSPICE', cspice_lib_path, (),
+                                                                uses_pgo('cspice', release)):
             print('-- CSPICE already configured')
-        else:
-            os.chdir(f'{spice_path}/src/cspice')
+            return
+
+        # Public symbols of a normal build, for checking unity builds against. The library that comes with the
+        # CSPICE download (which has no build profile stamp) is a normal build.
+        symbols_file = f'{cache_path}/cspice-{versions["cspice"]}-{plat}-{cpu_bits}.symbols'
+        if (not os.path.exists(symbols_file) and os.path.exists(f'{cspice_lib_path}/cspice.a')
+                and not os.path.exists(f'{cspice_lib_path}/build-profile.txt')):
+            save_library_symbols(f'{cspice_lib_path}/cspice.a', symbols_file)
+
+        if install_prebuilt('cspice', cspice_lib_path, debug, release):
+            return
+
+        os.makedirs(cspice_lib_path, exist_ok=True)
+        os.chdir(f'{spice_path}/src/cspice')
+
+        # mkprodct.csh compiles with $TKCOMPILER
+        if options['profile_compile']:
+            profiled_compilers('cspice')
+            os.environ['TKCOMPILER'] = compile_profiler('cspice', os.getenv('TKCOMPILER', 'cc'))
+
+        def compile_library(build_type: str) -> int:
+            log_file = f'{logs_path}/cspice_build_{build_type}.log'
+            start = time.perf_counter()
+            if not options['cspice_unity']:
+                make_flag = os.system(f'./mkprodct.csh > "{log_file}" 2>&1')
+                if make_flag == 0:
+                    save_library_symbols(f'{cspice_lib_path}/cspice.a', symbols_file)
+            else:
+                make_flag = compile_cspice_unity(f'{spice_path}/src/cspice', os.environ['TKCOMPILEOPTIONS'],
+                                                 f'{cspice_lib_path}/cspice.a', log_file)
+                if make_flag == 0:
+                    check_library_symbols(f'{cspice_lib_path}/cspice.a', symbols_file)
+
+            if make_flag != 0:
+                print(triage_log(log_file))
+            else:
+                record_build_time('cspice', f'build_{build_type}', time.perf_counter() - start)
+            return make_flag
 
         if debug:
             # Compile debug CSPICE with integer uiolen [GMT-5044]
             print('Compiling CSPICE debug library. This could take a while...')
             os.environ[
                 'TKCOMPILEOPTIONS'] = f'{tk_compile_arch} -c -ansi {flags} -g -fPIC -DNON_UNIX_STDIO -DUIOLEN_int'
-            make_flag = os.system(f'./mkprodct.csh > "{logs_path}/cspice_build_debug.log" 2>&1')
+            make_flag = compile_library('debug')
 
             if make_flag == 0:
                 os.system('mv ../../lib/cspice.a ../../lib/cspiced.a')
+                if not release:
+                    record_install('cspice', cspice_lib_path, debug, release)
             else:
                 print('CSPICE debug build failed. Fix errors and try again.')
 
-        if release:
+        def build_release(extra_flags: str = '') -> int:
             # Compile release CSPICE with integer uiolen [GMT-5044]
+            release_flags = profile_flags()[0]
+            os.environ['TKCOMPILEOPTIONS'] = (f'{tk_compile_arch} -c -ansi {flags} {release_flags} {extra_flags} '
+                                              f'-fPIC -DNON_UNIX_STDIO -DUIOLEN_int')
+            return compile_library('release')
+
+        if release:
             print('Compiling CSPICE release library. This could take a while...')
-            os.environ[
-                'TKCOMPILEOPTIONS'] = f'{tk_compile_arch} -c -ansi {flags} -O2 -fPIC -DNON_UNIX_STDIO -DUIOLEN_int'
-            make_flag = os.system(f'./mkprodct.csh > "{logs_path}/cspice_build_release.log" 2>&1')
+            make_flag = build_release()
 
             if make_flag != 0:
                 print('CSPICE release build failed. Fix errors and try again.')
+            else:
+                if options['pgo']:
+                    pgo_build('cspice', build_release, 'cspice_train.c',
+                              f'-I"{spice_path}/include" "{cspice_lib_path}/cspice.a" -lm')
+                write_profile_stamp(cspice_lib_path, uses_pgo('cspice', release))
+                share_install('cspice', cspice_lib_path, debug, release)
+
+        compile_time_report('cspice')
 
 
 def build_swig(opts: dict):
@@ -651,7 +3557,7 @@ def build_swig(opts: dict):
 
     print('\n********** Configuring SWIG **********')
     direc = opts['dir']
-    swig_build_path = f'{direc}/{plat}-build'
+    swig_build_path = build_location('swig', f'{direc}/{plat}-build')
     swig_install_path = f'{direc}/{plat}-install'
 
     # Find a test file to check if SWIG has already been installed
@@ -659,32 +3565,354 @@ def build_swig(opts: dict):
 
     version = versions['swig']
 
+    if use_system_install('swig', swig_install_path):
+        return
+
     # Build SWIG if the test file doesn't already exist
-    if os.path.exists(swig_test_file):
+    if os.path.exists(swig_test_file) and profile_matches('SWIG', swig_install_path, (swig_build_path,)):
         print(f'SWIG {version} already configured')
         return
+    if install_prebuilt('swig', swig_install_path, False, True):
+        return
 
     os.makedirs(swig_build_path, exist_ok=True)
     os.chdir(swig_build_path)
 
     # [GMT-6892] Build static PCRE using SWIG-provided build script
     pcre_name = opts['pcre_name']
-    os.rename(f'../{pcre_name}', f'./{pcre_name}')
-    os.system(f'../Tools/pcre-build.sh > "{logs_path}/pcre_build.log" 2>&1')
+    # pcre-build.sh runs its own configure, which picks up the shared cache through CONFIG_SITE
+    shutil.move(f'{direc}/{pcre_name}', f'./{pcre_name}')
+    os.environ['CONFIG_SITE'] = f'{autoconf_cache()}/config.site'
+    os.system(f'"{direc}/Tools/pcre-build.sh" > "{logs_path}/pcre_build.log" 2>&1')
 
     # For users who compile GMAT on multiple platforms side-by-side.
     # Running Windows configure.bat causes Mac/Linux configure scripts
     # to have missing permissions.
-    os.system('chmod u+x ../configure')
+    os.system(f'chmod u+x "{direc}/configure"')
 
     print(f'Configuring SWIG {version} tool. This could take a while...')
-    os.system(f'../configure --prefix="{swig_install_path}" > "{logs_path}/swig_configure.log" 2>&1')
+    run_configure(f'"{direc}/configure"', f'{profile_configure_flags()} {profiled_compilers("swig")} '
+                  f'--prefix="{swig_install_path}"', 'swig_configure', profile_configure_flags())
 
     make_depend('SWIG', 'build')
     make_depend('SWIG', 'install')
+    compile_time_report('swig')
+    write_profile_stamp(swig_install_path)
+    share_install('swig', swig_install_path, False, True)
+
+    os.chdir(direc)
+    remove_build_dir(swig_build_path)
+
+
+def swig_command() -> str:
+    """
+    Get the SWIG that GMAT's dependencies provide, or the system one if that is used instead.
+    """
+    if windows:
+        return f'{depends_paths["swig"]}/swigwin/swig.exe'
+    return f'{depends_paths["swig"]}/swig/{plat}-install/bin/swig'
+
+
+@functools.lru_cache(maxsize=None)
+def gmat_include_dirs() -> tuple[str]:
+    """
+    Find every folder of GMAT's sources that has headers, which the API wrappers need to compile.
+    """
+    header_dirs = {os.path.dirname(header) for pattern in ('src/**/*.hpp', 'src/**/*.h')
+                   for header in glob.glob(f'{gmat_path}/{pattern}', recursive=True)}
+    return tuple(sorted(header_dirs))
+
+
+def generate_api_wrappers(interfaces: list[str]) -> dict[str, str]:
+    """
+    Generate the C++ wrapper source of each Python API interface with SWIG, all at once. The wrappers don't depend
+    on the Python version, so they are generated once for all the versions being built, and kept in the cache
+    for as long as the SWIG version and the interfaces stay the same. Returns the wrapper of each API module.
+    """
+    swig = swig_command()
+    swig_version = subprocess.run([swig, '-version'], capture_output=True, text=True).stdout
+    key = hashlib.sha256(swig_version.encode())
+    for interface in interfaces:
+        # An interface includes the others in its folder, so they are part of the key too
+        for related in sorted(glob.glob(f'{os.path.dirname(interface)}/*.i')):
+            key.update(f'{related} {hash_file(related)}'.encode())
+    wrapper_dir = f'{cache_path}/python-api/{key.hexdigest()[:16]}'
+    os.makedirs(wrapper_dir, exist_ok=True)
+    include_flags = [f'-I{include_dir}' for include_dir in gmat_include_dirs()]
+
+    def generate(interface: str) -> tuple[str, str]:
+        # The module is named by the interface's %module directive, which needn't match its file name
+        with open(interface, 'r', errors='replace') as f:
+            module_match = re.search(r'^\s*%module\s*(?:\([^)]*\))?\s*(\w+)', f.read(), re.MULTILINE)
+        module = module_match.group(1) if module_match else os.path.splitext(os.path.basename(interface))[0]
+        wrapper = f'{wrapper_dir}/{module}_wrap.cxx'
+        if os.path.exists(wrapper):
+            return module, wrapper
+
+        with open(f'{logs_path}/python_api_swig_{module}.log', 'w') as log:
+            result = subprocess.run([swig, '-c++', '-python', '-outdir', wrapper_dir, '-o', f'{wrapper}.tmp',
+                                     *include_flags, interface], stdout=log, stderr=subprocess.STDOUT)
+        if result.returncode != 0:
+            raise RuntimeError(f'SWIG failed on {interface}. See {logs_path}/python_api_swig_{module}.log')
+        os.replace(f'{wrapper}.tmp', wrapper)
+        return module, wrapper
+
+    print(f'-- Generating Python API wrappers for {len(interfaces)} interfaces with SWIG...')
+    with concurrent.futures.ThreadPoolExecutor(len(interfaces)) as pool:
+        return dict(pool.map(generate, interfaces))
+
+
+def compile_python_api(version: str, python: dict, wrappers: dict[str, str], debug: bool) -> dict:
+    """
+    Compile and link the API extension of every module for one Python version, installing them (with their Python
+    modules from SWIG) in application/bin/gmatpy/_py3X. Runs in a worker process, and returns whether each
+    module built and how long the version took.
+    """
+    start = time.perf_counter()
+    version_nodot = version.replace('.', '')
+    out_dir = f'{gmat_path}/application/bin/gmatpy/_py{version_nodot}'
+    lib_dir = f'{gmat_path}/application/bin'
+    os.makedirs(out_dir, exist_ok=True)
+    log_file = f'{logs_path}/python_api_{version}.log'
+    debug_suffix = '_d' if windows and debug else ''
+    includes = [python['include'], *gmat_include_dirs()]
+
+    built = {}
+    with open(log_file, 'w') as log:
+        for module, wrapper in wrappers.items():
+            ext_suffix = python.get('ext_suffix') or ('.pyd' if windows else '.so')
+            extension = f'{out_dir}/_{module}{debug_suffix}{ext_suffix}'
+            if windows:
+                python_libs = os.path.join(os.path.dirname(python['path']), 'libs')
+                command = (f'cl /nologo /LD /EHsc /bigobj {"/MDd /Zi" if debug else "/MD /O2"} '
+                           + ' '.join(f'/I"{include}"' for include in includes)
+                           + f' "{wrapper}" /Fo"{out_dir}/{module}.obj" /link /LIBPATH:"{python_libs}" '
+                           f'/LIBPATH:"{lib_dir}" python{version_nodot}{debug_suffix}.lib '
+                           + ' '.join(f'lib{lib}{debug_suffix}.lib' for lib in python_api_libs)
+                           + f' /OUT:"{extension}"')
+            else:
+                # Extensions resolve the Python symbols from the interpreter that loads them
+                undefined = '-undefined dynamic_lookup' if macos else ''
+                command = (f'{os.getenv("CXX", "c++")} -shared -fPIC {"-g -O0" if debug else "-O2"} '
+                           + ' '.join(f'-I"{include}"' for include in includes)
+                           + f' "{wrapper}" -L"{lib_dir}" '
+                           + ' '.join(f'-l{lib}' for lib in python_api_libs)
+                           + f' -Wl,-rpath,"{lib_dir}" {undefined} -o "{extension}"')
+
+            log.write(f'\n---------- {module} ----------\n{command}\n')
+            log.flush()
+            built[module] = subprocess.run(command, shell=True, stdout=log, stderr=subprocess.STDOUT).returncode == 0
+            if built[module]:
+                shutil.copy2(f'{os.path.dirname(wrapper)}/{module}.py', f'{out_dir}/{module}.py')
+
+    return {'version': version, 'built': built, 'seconds': time.perf_counter() - start}
+
+
+def build_python_api(py_versions: list[str], debug: bool):
+    """
+    Build the GMAT Python API for each of the Python versions given, in parallel worker processes, from wrappers
+    generated once with SWIG. Reports which modules built for which versions, and how long each version took.
+    """
+    print('\n********** Building the GMAT Python API **********')
+    interfaces = sorted({interface for pattern in python_api_interfaces
+                         for interface in glob.glob(f'{gmat_path}/{pattern}', recursive=True)})
+    if not interfaces:
+        print(f'-- No Python API interfaces found in {gmat_path} ({", ".join(python_api_interfaces)})')
+        return
+
+    # The extensions link against GMAT's own libraries, which only exist once GMAT itself has been built
+    lib_dir = f'{gmat_path}/application/bin'
+    debug_suffix = '_d' if windows and debug else ''
+    missing_libs = [lib for lib in python_api_libs
+                    if not glob.glob(f'{lib_dir}/lib{lib}{debug_suffix}.lib' if windows else f'{lib_dir}/lib{lib}.*')]
+    if missing_libs:
+        print(f'-- GMAT\'s {", ".join(missing_libs)} libraries not found in {lib_dir}, so not building the Python '
+              f'API. Build GMAT first.')
+        return
+
+    pythons = toolchain_info()['python']
+    missing = [version for version in py_versions if version not in pythons]
+    if missing:
+        print(f'-- Python {", ".join(missing)} not found, so not building the API for '
+              f'{"it" if len(missing) == 1 else "them"}')
+    py_versions = [version for version in py_versions if version in pythons]
+    if not py_versions:
+        return
+
+    wrappers = generate_api_wrappers(interfaces)
+    print(f'-- Compiling the Python API for Python {", ".join(py_versions)}...')
+    os.chdir(depends_dir)  # worker processes that start afresh find the GMAT folder from their working directory
+    with concurrent.futures.ProcessPoolExecutor(min(len(py_versions), cores)) as pool:
+        results = list(pool.map(compile_python_api, py_versions, [pythons[version] for version in py_versions],
+                                [wrappers] * len(py_versions), [debug] * len(py_versions)))
+
+    modules = list(wrappers)
+    width = max(len(module) for module in modules) + 2
+    print(f'-- {"Python":8}' + ''.join(f'{module:{width}}' for module in modules) + 'Time')
+    for result in results:
+        print(f'-- {result["version"]:8}' +
+              ''.join(f'{"OK" if result["built"][module] else "FAILED":{width}}' for module in modules) +
+              f'{result["seconds"]:.0f} s')
+        record_build_time('python-api', f'python{result["version"]}', result['seconds'], len(modules), report=False)
+
+    failed = [result['version'] for result in results if not all(result['built'].values())]
+    if failed:
+        raise RuntimeError(f'Python API build failed for Python {", ".join(failed)}. '
+                           f'See {logs_path}/python_api_<version>.log')
+
+
+def step_estimate(dependency: str, step: str) -> dict:
+    """
+    Estimate how long a build step will take (and for downloads, how many bytes it fetches) from the recent runs
+    recorded in build_times_file: the median of those with the selected build profile, or of all of them if none
+    used it. The estimates are None if the step has never been recorded.
+    """
+    history = load_build_times().get(dependency.lower(), {}).get(step, [])
+    runs = [run for run in history if run.get('build_profile') == options['build_profile']] or history
+    if not runs:
+        return {'seconds': None, 'bytes': None}
+
+    def median(values: list[float]) -> float:
+        return sorted(values)[len(values) // 2]
+
+    sizes = [run['bytes'] for run in runs if run.get('bytes')]
+    return {'seconds': median([run['seconds'] for run in runs]), 'bytes': median(sizes) if sizes else None}
+
+
+def install_source(dependency: str, install_path: str, test_file: str, debug: bool, release: bool) -> str:
+    """
+    Work out where a dependency's install would come from, without changing anything: "system", "installed"
+    (already built with the selected profile), "store", "binary cache", or "build".
+    """
+    if dependency in system_installs:
+        return 'system'
+    if test_file and os.path.exists(test_file) and \
+            installed_profile(install_path) == profile_description(uses_pgo(dependency, release)):
+        return 'installed'
+
+    key = build_key(dependency, debug, release)
+    if store_path() and os.path.exists(f'{store_path()}/trees/{key}.json'):
+        return 'store'
+    if options['binary_cache']:
+        try:
+            if binary_cache_request('HEAD', f'/artifacts/{key}/manifest')[0] == 200:
+                return 'binary cache'
+        except (OSError, http.client.HTTPException):
+            pass
+    return 'build'
+
 
-    os.chdir('..')
-    os.remove(swig_build_path)
+def plan() -> list[dict]:
+    """
+    Show what a run would do, in order, without doing any of it: the downloads, and the configures, builds and
+    installs of each dependency that isn't already installed or available from the system, the store or the
+    binary cache, with their sizes and durations estimated from earlier runs. The configuration and Python versions
+    to plan for are given by the plan_config and plan_python options. Returns the steps of the plan.
+    """
+    debug = options['plan_config'] in ('debug', 'both')
+    release = options['plan_config'] in ('release', 'both')
+    py_versions = [version for version in options['plan_python'].split(',') if version]
+    params = platform_params()
+    # Progress messages would get in the way of a plan printed as JSON, so they go to stderr instead
+    with contextlib.redirect_stdout(sys.stderr if options['plan_json'] else sys.stdout):
+        if not toolchain:
+            toolchain.update(probe_toolchain(save=False))
+        if options['use_system']:
+            find_system_installs()
+
+    steps = []
+
+    def add(stage: str, dependency: str, action: str, step: str = ''):
+        estimate = step_estimate(dependency, step) if step else {'seconds': 0, 'bytes': 0}
+        steps.append({'stage': stage, 'dependency': dependency, 'action': action, 'step': step} | estimate)
+
+    # Downloads, with the same checks as download_depends()
+    java_path = f'{depends_paths["java"]}/{params["java_opts"]["plat"]}'
+    for dependency, downloaded in (('xerces', depends_paths['xerces']), ('wxWidgets', depends_paths['wxWidgets']),
+                                   ('cspice', params['cspice_opts']['path']), ('swig', params['swig_opts']['dir']),
+                                   ('java', f'{java_path}/jdk')):
+        if dependency in system_installs and not (windows and dependency == 'swig'):
+            add('download', dependency, 'skip: using the system install')
+        elif os.path.exists(downloaded):
+            add('download', dependency, 'skip: already downloaded')
+        else:
+            add('download', dependency, 'download', 'download')
+            if dependency == 'swig' and not windows:
+                add('download', 'pcre', 'download', 'download')
+
+    # Builds, in the order they run, with the same checks as the build_* functions
+    spice_lib = f'{params["cspice_opts"]["path"]}/{params["cspice_opts"]["dir"]}/lib'
+    wx_path = f'{depends_paths["wxWidgets"]}/wxWidgets-{versions["wxWidgets"]}'
+    wx_series = '.'.join(versions['wxWidgets'].split('.')[:2])
+    xerces_install = f'{depends_paths["xerces"]}/{"windows" if windows else "cocoa" if macos else "linux"}-install'
+    swig_install = f'{params["swig_opts"]["dir"]}/{plat}-install'
+    build_types = [build_type for build_type, wanted in (('debug', debug), ('release', release)) if wanted]
+    if windows:
+        wx_install = f'{depends_dir}/wxWidgets/wxWidgets-{versions["wxWidgets"]}/lib/vc{params["wx_opts"]["type"]}dll'
+        builds = [('cspice', spice_lib, '', [f'build_{build_type}' for build_type in build_types]),
+                  ('xerces', xerces_install, xerces_install, [f'build_{build_type}' for build_type in build_types]),
+                  ('wxWidgets', wx_install, wx_install, [f'build_{build_type}' for build_type in build_types])]
+    else:
+        wx_install = f'{wx_path}/{plat}-install'
+        builds = [('cspice', spice_lib, f'{spice_lib}/cspiced.a',
+                   [f'build_{build_type}' for build_type in build_types]),
+                  ('xerces', xerces_install, f'{xerces_install}/lib/libxerces-c.a',
+                   [f'{step}_{build_type}' for build_type in build_types
+                    for step in ('configure', 'build', 'install')]),
+                  ('wxWidgets', wx_install, f'{wx_install}/lib/libwx_baseu-{wx_series}.{params["wx_opts"]["ext"]}',
+                   ['configure', 'build', 'install']),
+                  ('swig', swig_install, f'{swig_install}/bin/swig', ['configure', 'build', 'install'])]
+
+    for dependency, install_path, test_file, build_steps in builds:
+        # wxWidgets and SWIG always build a single release-style install
+        build_debug, build_release = (False, True) if dependency in ('wxWidgets', 'swig') else (debug, release)
+        source = install_source(dependency, install_path, test_file, build_debug, build_release)
+        if source == 'build':
+            for step in build_steps:
+                add('build', dependency, step.split('_')[0], step)
+        else:
+            add('build', dependency, {'system': 'skip: using the system install', 'installed': 'skip: up to date',
+                                      'store': 'restore from the store',
+                                      'binary cache': 'fetch from the binary cache'}[source])
+
+    for version in py_versions:
+        if version in toolchain['python']:
+            add('api', 'python-api', f'build for Python {version}', f'python{version}')
+        else:
+            add('api', 'python-api', f'skip: Python {version} not found')
+
+    # Downloads run at once, sharing any bandwidth limit; everything else runs one after another, apart from the
+    # Python API builds, which run at once too
+    download_seconds = max([step['seconds'] or 0 for step in steps if step['stage'] == 'download'], default=0)
+    if float(options['download_limit']):
+        download_bytes = sum(step['bytes'] or 0 for step in steps if step['stage'] == 'download')
+        download_seconds = max(download_seconds, download_bytes / (float(options['download_limit']) * 1e6))
+    build_seconds = sum(step['seconds'] or 0 for step in steps if step['stage'] == 'build')
+    api_seconds = max([step['seconds'] or 0 for step in steps if step['stage'] == 'api'], default=0)
+    unknown = [step for step in steps if step['seconds'] is None]
+    total = {'download_seconds': round(download_seconds), 'build_seconds': round(build_seconds + api_seconds),
+             'total_seconds': round(download_seconds + build_seconds + api_seconds),
+             'download_bytes': sum(step['bytes'] or 0 for step in steps if step['stage'] == 'download'),
+             'steps_without_history': len(unknown)}
+
+    if options['plan_json']:
+        print(json.dumps({'configuration': options['plan_config'], 'steps': steps} | total, indent=1))
+        return steps
+
+    def minutes(seconds: float) -> str:
+        return '?' if seconds is None else f'{seconds / 60:.0f} min' if seconds >= 90 else f'{seconds:.0f} s'
+
+    print(f'\n*** Plan for a {options["plan_config"]} build ***\n')
+    for number, step in enumerate(steps, 1):
+        size = f'{step["bytes"] / 1e6:.1f} MB' if step['bytes'] else ''
+        time_taken = '' if step['action'].startswith('skip') else minutes(step['seconds'])
+        print(f'{number:3}  {step["stage"]:9} {step["dependency"]:11} {step["action"]:32} {size:>9} {time_taken:>7}')
+
+    print(f'\n-- Downloads: {total["download_bytes"] / 1e6:.0f} MB in about {minutes(download_seconds)} (run at once)')
+    print(f'-- Builds: about {minutes(build_seconds + api_seconds)}')
+    print(f'-- Total: about {minutes(total["total_seconds"])}'
+          + (f', not counting {len(unknown)} steps that have never been run here' if unknown else ''))
+    return steps
 
 
 def prompt(allowed_values: dict, prompt_text: str, print_selection: bool = False):
@@ -718,8 +3946,8 @@ def prompt(allowed_values: dict, prompt_text: str, print_selection: bool = False
 def py_ver_prompt():
     default = 'All'
     major_ver = 3
-    minor_ver_min = 6
-    minor_ver_max = 12
+    minor_ver_min = python_minor_versions[0]
+    minor_ver_max = python_minor_versions[-1]
     min_ver = f'{major_ver}.{minor_ver_min}'
     max_ver = f'{major_ver}.{minor_ver_max}'
     vers = input('Please specify which version(s) of Python to build for, separating with commas '
@@ -732,9 +3960,8 @@ def py_ver_prompt():
         vers = str(vers)
 
     # Check that all specified versions are valid
-    vers = vers.split(',')
+    vers = [ver.replace(' ', '') for ver in vers.split(',')]  # remove any spaces
     for ver in vers:
-        ver = ver.replace(' ', '')  # remove any spaces
         major, minor = ver.split('.')  # split into major and minor parts of version number
         if (int(major) != 3) or (int(minor) < minor_ver_min) or (int(minor) > minor_ver_max):
             raise ValueError(f'Invalid Python version specified: {ver}')
@@ -750,6 +3977,13 @@ def setup():
     if not os.path.exists(logs_path):
         os.mkdir(logs_path)
 
+    return platform_params()
+
+
+def platform_params() -> dict:
+    """
+    Get the settings for building the dependencies on this platform.
+    """
     cpu_cores: int = os.cpu_count() if os.cpu_count() is not None else 1  # num cores for multithreaded compilation
 
     pcre_params = {'pcre_ver': versions['pcre'],
@@ -814,6 +4048,7 @@ def menu():
 
     api, api_desc = prompt(api_values, 'which API(s) to build')
 
+    py_versions = []
     if 'Python' in api_desc:
         py_versions = py_ver_prompt()
 
@@ -823,14 +4058,10 @@ def menu():
             platform = sys.platform
             if platform != 'win32':
                 print('Current platform is not Windows so no problem.')
-                return True
             else:
-                appdata_local = os.getenv('LOCALAPPDATA')
+                pythons = toolchain_info()['python']
                 for ver in py_versions:
-                    ver_num = ver.replace('.', '')
-                    py_root = f'{appdata_local}/Programs/Python/Python{ver_num}/libs'
-                    debug_lib = f'python{ver_num}_d.lib'
-                    if not os.path.isfile(f'{py_root}/{debug_lib}'):
+                    if not pythons.get(ver, {}).get('debug_lib'):
                         raise FileNotFoundError(f'Could not find debug lib for Python {ver}')
                     else:
                         print(f'\t- Found debug lib for Python {ver}')
@@ -841,7 +4072,7 @@ def menu():
     print(f'Setting up configuration "{config_desc}" '
           f'{f"with APIs {api_desc}" if api_desc != "None" else "without APIs"}')
 
-    return debug, release
+    return debug, release, py_versions
 
 
 windows = macos = linux = False  # current platform will be set to true in setup()
@@ -856,19 +4087,57 @@ else:
 cpu_bits: int = struct.calcsize('P') * 8  # number of CPU bits (32-bit or 64-bit)
 bits_32: bool = True if cpu_bits == 32 else False
 
-setup_params: dict = setup()
-cores = setup_params['cores']
+plat_folder = 'windows' if windows else 'macosx' if macos else 'linux'  # name of this platform's CSPICE/Java folders
 
-db, rl = menu()  # debug and release bools
+# Commands that can be given as the first command line argument, instead of setting up the dependencies
+# e.g. python config-cmdline.py store-gc store_dir=auto. A command that returns False exits with an error status.
+commands = {
+    'store-gc': store_gc,
+    'status': status,
+    'verify': verify,
+    'gc': gc,
+    'plan': plan,
+}
 
-if windows:
-    setup_windows()
+if __name__ == '__main__':
+    command = sys.argv[1] if len(sys.argv) > 1 and '=' not in sys.argv[1] else ''
+    parse_options(sys.argv[2:] if command else sys.argv[1:])
+    if command:
+        if command not in commands:
+            raise ValueError(f'Unrecognised command "{command}". Allowed commands: {", ".join(commands)}')
+        sys.exit(commands[command]() is False)
+
+    setup_params: dict = setup()
+    cores = setup_params['cores']
+    toolchain_info()
+
+    clear_failed_logs()
+    find_system_installs()
+    if float(options['depends_budget']):
+        collect_garbage(float(options['depends_budget']))
+    prefetch = start_prefetch(setup_params)
+    try:
+        db, rl, py_versions = menu()  # debug and release bools, and Python versions to build the API for
 
-download_depends(setup_params)
+        if windows:
+            setup_windows()
+    except BaseException:
+        finish_prefetch(prefetch, cancel=True)
+        raise
 
-# def build_depends():
-build_cspice(db, rl, setup_params['cspice_opts'])
-build_xerces(db, rl)
-wx_opts = setup_params['wx_opts']
-build_wxWidgets(db, rl, setup_params['wx_opts'])
-build_swig(setup_params['swig_opts'])
+    build_failed = True
+    try:
+        finish_prefetch(prefetch)
+
+        # def build_depends():
+        build_cspice(db, rl, setup_params['cspice_opts'])
+        build_xerces(db, rl)
+        wx_opts = setup_params['wx_opts']
+        build_wxWidgets(db, rl, setup_params['wx_opts'])
+        build_swig(setup_params['swig_opts'])
+        if py_versions:
+            build_python_api(py_versions, db)
+        build_failed = False
+    finally:
+        finish_cleanup()
+        archive_logs(build_failed)
@@ -0,0 +1,77 @@
+/*
+ * Training workload for profile-guided optimisation (PGO) of CSPICE - see build_cspice() in config-cmdline.py.
+ *
+ * Writes a synthetic SPK kernel for a spacecraft in a circular Earth orbit, then repeatedly makes the kind of
+ * ephemeris lookups and frame transformations that dominate GMAT propagation runs. No other kernels are needed.
+ */
+#include <stdio.h>
+#include <math.h>
+#include "SpiceUsr.h"
+
+#define KERNEL "pgo_train.bsp"
+#define SPACECRAFT (-999)
+#define EARTH 399
+#define N_STATES 2001
+#define STEP 60.0
+#define N_LOOKUPS 200000
+
+int main(void)
+{
+    static SpiceDouble states[N_STATES][6];
+    SpiceDouble first = 0.0;
+    SpiceDouble last = first + (N_STATES - 1) * STEP;
+    SpiceDouble radius = 7000.0;                     /* km */
+    SpiceDouble rate = sqrt(398600.4418 / (radius * radius * radius)); /* rad/s */
+    SpiceDouble state[6], rotate[3][3], xform[6][6], position[3], lt, et;
+    SpiceDouble checksum = 0.0;
+    SpiceInt handle, i;
+
+    erract_c("SET", 0, "RETURN");
+
+    for (i = 0; i < N_STATES; i++)
+    {
+        SpiceDouble angle = rate * i * STEP;
+        states[i][0] = radius * cos(angle);
+        states[i][1] = radius * sin(angle) * cos(0.5);
+        states[i][2] = radius * sin(angle) * sin(0.5);
+        states[i][3] = -radius * rate * sin(angle);
+        states[i][4] = radius * rate * cos(angle) * cos(0.5);
+        states[i][5] = radius * rate * cos(angle) * sin(0.5);
+    }
+
+    remove(KERNEL);
+    spkopn_c(KERNEL, "PGO training", 0, &handle);
+    spkw08_c(handle, SPACECRAFT, EARTH, "J2000", first, last, "synthetic orbit", 7, N_STATES, states, first, STEP);
+    spkcls_c(handle);
+    furnsh_c(KERNEL);
+
+    for (i = 0; i < N_LOOKUPS && !failed_c(); i++)
+    {
+        et = first + fmod(i * 37.3, last - first);
+
+        spkgeo_c(SPACECRAFT, et, "J2000", EARTH, state, &lt);
+        checksum += state[0];
+
+        spkezr_c("-999", et, "ECLIPJ2000", "NONE", "EARTH", state, &lt);
+        checksum += state[1];
+
+        pxform_c("J2000", "ECLIPJ2000", et, rotate);
+        mxv_c(rotate, state, position);
+        checksum += position[2];
+
+        sxform_c("J2000", "GALACTIC", et, xform);
+        checksum += xform[0][0];
+    }
+
+    unload_c(KERNEL);
+    remove(KERNEL);
+
+    if (failed_c())
+    {
+        fprintf(stderr, "CSPICE training workload failed\n");
+        return 1;
+    }
+
+    printf("checksum %f\n", checksum);
+    return 0;
+}
@@ -0,0 +1,92 @@
+// Training workload for profile-guided optimisation (PGO) of Xerces-C++ - see build_xerces() in config-cmdline.py.
+//
+// Builds a synthetic GMAT-style XML document in memory and parses it repeatedly with both the DOM and SAX2
+// parsers, walking the resulting trees so that the parser, scanner and DOM code paths are all exercised.
+#include <xercesc/util/PlatformUtils.hpp>
+#include <xercesc/framework/MemBufInputSource.hpp>
+#include <xercesc/parsers/XercesDOMParser.hpp>
+#include <xercesc/sax2/Attributes.hpp>
+#include <xercesc/sax2/DefaultHandler.hpp>
+#include <xercesc/sax2/SAX2XMLReader.hpp>
+#include <xercesc/sax2/XMLReaderFactory.hpp>
+#include <xercesc/dom/DOM.hpp>
+#include <cstdio>
+#include <sstream>
+#include <string>
+
+XERCES_CPP_NAMESPACE_USE
+
+class CountingHandler : public DefaultHandler
+{
+public:
+    unsigned long count = 0;
+
+    void startElement(const XMLCh *const, const XMLCh *const, const XMLCh *const, const Attributes &attrs) override
+    {
+        count += 1 + attrs.getLength();
+    }
+
+    void characters(const XMLCh *const, const XMLSize_t length) override
+    {
+        count += length;
+    }
+};
+
+static unsigned long countNodes(const DOMNode *node)
+{
+    unsigned long count = 1;
+    const DOMNamedNodeMap *attrs = node->getAttributes();
+    if (attrs != nullptr)
+        count += attrs->getLength();
+    for (const DOMNode *child = node->getFirstChild(); child != nullptr; child = child->getNextSibling())
+        count += countNodes(child);
+    return count;
+}
+
+int main()
+{
+    XMLPlatformUtils::Initialize();
+
+    std::ostringstream xml;
+    xml << "<?xml version=\"1.0\" encoding=\"UTF-8\"?>\n<Mission name=\"PGO training\">\n";
+    for (int i = 0; i < 2000; i++)
+    {
+        xml << "  <Spacecraft id=\"" << i << "\" epoch=\"21545.0\" frame=\"EarthMJ2000Eq\">"
+            << "<Orbit sma=\"7000.0\" ecc=\"0.001\" inc=\"28.5\" raan=\"" << i % 360 << "\"/>"
+            << "<Note>Spacecraft &amp; orbit number " << i << "</Note>"
+            << "</Spacecraft>\n";
+    }
+    xml << "</Mission>\n";
+    const std::string doc = xml.str();
+
+    unsigned long total = 0;
+    {
+        XercesDOMParser domParser;
+        domParser.setValidationScheme(XercesDOMParser::Val_Never);
+        domParser.setDoNamespaces(true);
+
+        SAX2XMLReader *saxReader = XMLReaderFactory::createXMLReader();
+        CountingHandler handler;
+        saxReader->setContentHandler(&handler);
+        saxReader->setErrorHandler(&handler);
+
+        for (int pass = 0; pass < 50; pass++)
+        {
+            MemBufInputSource domSource(reinterpret_cast<const XMLByte *>(doc.data()), doc.size(), "pgo-dom");
+            domParser.parse(domSource);
+            total += countNodes(domParser.getDocument());
+            domParser.resetDocumentPool();
+
+            MemBufInputSource saxSource(reinterpret_cast<const XMLByte *>(doc.data()), doc.size(), "pgo-sax");
+            saxReader->parse(saxSource);
+        }
+        total += handler.count;
+
+        delete saxReader;
+    }
+
+    XMLPlatformUtils::Terminate();
+
+    std::printf("nodes %lu\n", total);
+    return 0;
+}